@@ -1,8 +1,31 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
 
 SOUND_DURATION: float = 5.0
 
+_DEFAULT_FOLDER = (Path(__file__).parent / "soundfiles").resolve()
+
+_EXCLUDE_DIRS: FrozenSet[str] = frozenset({".git", "__pycache__"})
+
+_MANIFEST_MAGIC = b"LDM2"
+# Part of the manifest keys, bumped to ignore the manifests written before
+_MANIFEST_GENERATION = 0
+
+# Directory modification times of a scan, relative to the dataset folder
+_DirTimes = Dict[str, int]
+
+_SCAN_CACHE: Dict[
+    Tuple[str, str, FrozenSet[str]], Tuple[_DirTimes, Dict[str, List[str]]]
+] = {}
+
 
 def get_cls_from_path(file: Path) -> str:
     """
@@ -16,12 +39,388 @@ def get_cls_from_path(file: Path) -> str:
     :param file: The file path.
     :return: The class name.
     """
-    return file.stem.split("_", maxsplit=1)[0]
+    return _get_cls_from_name(file.name)
+
+
+def _get_cls_from_name(name: str) -> str:
+    """
+    Return a sound class from a given file name, see :func:`get_cls_from_path`.
+
+    Class names are interned, as they are shared by many files
+    and used as dictionary keys.
+
+    :param name: The file name, with its extension.
+    :return: The class name.
+    """
+    dot = name.rfind(".")
+    stem = name if dot <= 0 else name[:dot]
+    return sys.intern(stem.partition("_")[0])
+
+
+def _parse_name(name: str, suffix: str, all_formats: bool) -> Optional[str]:
+    """
+    Return the sound class of a file name, if it matches the format.
+
+    Fuses the format check and :func:`_get_cls_from_name`, so that
+    the extension is only looked up once per file name.
+
+    :param name: The file name, with its extension.
+    :param suffix: The file suffix to match, e.g., `'.wav'`.
+    :param all_formats: If set, match any file that has an extension.
+    :return: The class name, or None if the file does not match.
+    """
+    dot = name.rfind(".")
+    if dot < 0 or not (all_formats or name.endswith(suffix)):
+        return None
+    stem = name if dot == 0 else name[:dot]
+    return sys.intern(stem.partition("_")[0])
+
+
+def _is_excluded(name: str, exclude_dirs: FrozenSet[str]) -> bool:
+    """
+    Return whether a directory should be skipped when scanning.
+
+    :param name: The directory name.
+    :param exclude_dirs: Additional directory names to skip.
+    :return: True if the directory is hidden or excluded.
+    """
+    return name.startswith(".") or name in exclude_dirs
+
+
+def _scan_tree(
+    root: str, suffix: str, all_formats: bool, exclude_dirs: FrozenSet[str]
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, int]]]:
+    """
+    Walk a folder and its subfolders, skipping excluded directories.
+
+    Uses :func:`os.fwalk` where available, so that the kernel resolves
+    names relative to an open directory file descriptor, and falls back
+    to :func:`os.scandir` otherwise (e.g., on Windows).
+
+    :param root: The folder to walk.
+    :param suffix: The file suffix to match, e.g., `'.wav'`.
+    :param all_formats: If set, match any file that has an extension.
+    :param exclude_dirs: Additional directory names to skip,
+        see :func:`_is_excluded`.
+    :return: The list of (class name, file path) pairs, and the list of
+        (directory path, modification time) pairs of the walked directories.
+    """
+    entries = []
+    # Each directory's modification time is read before listing it
+    dirs = []
+
+    if hasattr(os, "fwalk"):
+        join = os.path.join
+        dirs.append((root, os.stat(root).st_mtime_ns))
+
+        for dirpath, dirnames, filenames, dirfd in os.fwalk(root):
+            # Pruning in place prevents os.fwalk from descending
+            dirnames[:] = [
+                name for name in dirnames if not _is_excluded(name, exclude_dirs)
+            ]
+            dirs.extend(
+                (
+                    join(dirpath, name),
+                    os.stat(name, dir_fd=dirfd, follow_symlinks=False).st_mtime_ns,
+                )
+                for name in dirnames
+            )
+            entries.extend(
+                [
+                    (cls, join(dirpath, name))
+                    for name in filenames
+                    if (cls := _parse_name(name, suffix, all_formats)) is not None
+                ]
+            )
+
+        return entries, dirs
+
+    stack = [root]
+
+    while stack:
+        path = stack.pop()
+        dirs.append((path, os.stat(path).st_mtime_ns))
+
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _is_excluded(entry.name, exclude_dirs):
+                        stack.append(entry.path)
+                elif (cls := _parse_name(entry.name, suffix, all_formats)) is not None:
+                    entries.append((cls, entry.path))
+
+    return entries, dirs
+
+
+def _group_by_class(entries: List[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """
+    Group (class name, file path) pairs per class.
+
+    :param entries: The (class name, file path) pairs.
+    :return: The sorted list of file paths, per class, with the classes
+        ordered by their first file path.
+    """
+    # First pass: count files per class
+    counts = {}
+
+    for cls, _ in entries:
+        counts[cls] = counts.get(cls, 0) + 1
+
+    # Second pass: fill presized per-class lists
+    files = {cls: [None] * n for cls, n in counts.items()}
+    indices = dict.fromkeys(counts, 0)
+
+    for cls, path in entries:
+        i = indices[cls]
+        files[cls][i] = path
+        indices[cls] = i + 1
+
+    # Directory order depends on the filesystem, so sort once here
+    # (on plain strings) rather than in every caller.
+    for cls_files in files.values():
+        cls_files.sort()
+
+    # Order the classes as they first appear in the sorted file paths
+    return {cls: files[cls] for cls in sorted(files, key=lambda cls: files[cls][0])}
+
+
+def _scan_folder(
+    folder: Path, format: str, exclude_dirs: FrozenSet[str]
+) -> Tuple[_DirTimes, Dict[str, List[str]]]:
+    """
+    Scan a folder, including subfolders, for sound files.
+
+    :param folder: Where to find the soundfiles.
+    :param format: The sound files format, use
+        `'*'` to include all formats.
+    :param exclude_dirs: Additional directory names to skip,
+        see :func:`_is_excluded`.
+    :return: The modification time of each scanned directory, by path
+        relative to the folder, and the sorted list of file paths,
+        as strings, per class.
+    """
+    suffix = "." + format
+    all_formats = format == "*"
+    entries = []
+    subfolders = []
+
+    # Read the modification time before listing, so that a file added
+    # during the scan makes the result outdated rather than silently missing
+    top = os.fspath(folder)
+    start = len(os.path.join(top, ""))
+    mtimes = {"": os.stat(top).st_mtime_ns}
+
+    # List the top-level folder, and walk each of its
+    # subfolders in a separate thread, as os.scandir releases the GIL.
+    with os.scandir(top) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_excluded(entry.name, exclude_dirs):
+                    subfolders.append(entry.path)
+            elif (cls := _parse_name(entry.name, suffix, all_formats)) is not None:
+                entries.append((cls, entry.path))
+
+    def walk(root: str) -> None:
+        subentries, dirs = _scan_tree(root, suffix, all_formats, exclude_dirs)
+        entries.extend(subentries)
+        mtimes.update((path[start:], mtime_ns) for path, mtime_ns in dirs)
+
+    # A thread pool only pays off if there are several subtrees to walk
+    if len(subfolders) == 1:
+        walk(subfolders[0])
+    elif subfolders:
+        max_workers = min(32, len(subfolders), (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consume the results, to raise the workers' exceptions
+            list(executor.map(walk, subfolders))
+
+    return mtimes, _group_by_class(entries)
+
+
+def _is_up_to_date(folder: Path, mtimes: _DirTimes) -> bool:
+    """
+    Return whether none of the directories of a scan changed since.
+
+    Adding, removing or renaming a file or a subfolder updates the
+    modification time of its parent directory, so checking each scanned
+    directory is enough to detect changes at any depth.
+
+    :param folder: The dataset folder.
+    :param mtimes: The modification times recorded by the scan,
+        see :func:`_scan_folder`.
+    :return: True if the scan is still valid.
+    """
+    join = os.path.join
+    top = os.fspath(folder)
+
+    try:
+        return all(
+            os.stat(join(top, path)).st_mtime_ns == mtime_ns
+            for path, mtime_ns in mtimes.items()
+        )
+    except OSError:  # A directory was removed
+        return False
+
+
+def _manifest_key(folder: str, format: str, exclude_dirs: FrozenSet[str]) -> bytes:
+    """
+    Encode the scan parameters that a manifest is valid for.
+
+    :param folder: The resolved dataset folder.
+    :param format: The sound files format.
+    :param exclude_dirs: The directory names skipped by the scan.
+    :return: The encoded parameters.
+    """
+    params = [str(_MANIFEST_GENERATION), folder, format, *sorted(exclude_dirs)]
+    return os.fsencode("\0".join(params))
+
+
+def _read_manifest(
+    manifest: Path, folder: Path, key: bytes
+) -> Optional[Tuple[_DirTimes, Dict[str, List[str]]]]:
+    """
+    Read a scan result from a manifest file, see :func:`_write_manifest`.
+
+    :param manifest: The manifest file.
+    :param folder: The dataset folder.
+    :param key: The scan parameters, see :func:`_manifest_key`.
+    :return: The directory modification times and the list of file paths,
+        per class, or None if the manifest is missing or outdated.
+    """
+    try:
+        with (
+            open(manifest, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            magic, key_len = struct.unpack_from("<4sI", mm)
+            offset = struct.calcsize("<4sI")
+
+            if magic != _MANIFEST_MAGIC or mm[offset : offset + key_len] != key:
+                return None
+
+            offset += key_len
+            (ndirs,) = struct.unpack_from("<I", mm, offset)
+            offset += 4
+            mtimes = {}
+
+            for _ in range(ndirs):
+                path_len, mtime_ns = struct.unpack_from("<Iq", mm, offset)
+                offset += 12
+                mtimes[os.fsdecode(mm[offset : offset + path_len])] = mtime_ns
+                offset += path_len
+
+            if not _is_up_to_date(folder, mtimes):
+                return None
+
+            top = os.fspath(folder)
+            (nclass,) = struct.unpack_from("<I", mm, offset)
+            offset += 4
+            files = {}
+
+            for _ in range(nclass):
+                (cls_len,) = struct.unpack_from("<I", mm, offset)
+                offset += 4
+                cls = sys.intern(os.fsdecode(mm[offset : offset + cls_len]))
+                offset += cls_len
+                (nfiles,) = struct.unpack_from("<I", mm, offset)
+                offset += 4
+                cls_files = [None] * nfiles
+
+                for i in range(nfiles):
+                    (path_len,) = struct.unpack_from("<I", mm, offset)
+                    offset += 4
+                    cls_files[i] = os.path.join(
+                        top, os.fsdecode(mm[offset : offset + path_len])
+                    )
+                    offset += path_len
+
+                files[cls] = cls_files
+
+            return mtimes, files
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        # Missing, empty or corrupted manifest
+        return None
+
+
+def _write_manifest(
+    manifest: Path,
+    folder: Path,
+    key: bytes,
+    mtimes: _DirTimes,
+    files: Dict[str, List[str]],
+) -> None:
+    """
+    Write a scan result to a manifest file.
+
+    The layout is `(magic, key_len, key, ndirs, [path_len, mtime_ns, path]*,
+    nclass, [cls_len, cls, nfiles, [path_len, path]*]*)`, with little-endian
+    integers and paths relative to the dataset folder, encoded like
+    file names (see :func:`os.fsencode`).
+
+    The file is written under a temporary name first and then renamed,
+    so that concurrent readers never see a partial manifest.
+
+    :param manifest: The manifest file.
+    :param folder: The dataset folder.
+    :param key: The scan parameters, see :func:`_manifest_key`.
+    :param mtimes: The directory modification times, see :func:`_scan_folder`.
+    :param files: The list of file paths, per class.
+    """
+    start = len(os.path.join(os.fspath(folder), ""))
+    chunks = [struct.pack("<4sI", _MANIFEST_MAGIC, len(key)), key]
+    chunks.append(struct.pack("<I", len(mtimes)))
+
+    for path, mtime_ns in mtimes.items():
+        encoded = os.fsencode(path)
+        chunks.append(struct.pack("<Iq", len(encoded), mtime_ns))
+        chunks.append(encoded)
+
+    chunks.append(struct.pack("<I", len(files)))
+
+    for cls, cls_files in files.items():
+        encoded = os.fsencode(cls)
+        chunks.append(struct.pack("<I", len(encoded)))
+        chunks.append(encoded)
+        chunks.append(struct.pack("<I", len(cls_files)))
+
+        for path in cls_files:
+            encoded = os.fsencode(path[start:])
+            chunks.append(struct.pack("<I", len(encoded)))
+            chunks.append(encoded)
+
+    fd, tmp = tempfile.mkstemp(dir=manifest.parent, prefix=manifest.name)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(chunks))
+
+        os.replace(tmp, manifest)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
 
 class Dataset:
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """
+        Clear the cache of folder scans shared by all datasets,
+        and ignore the manifest files written so far.
+
+        Changes to the folders are detected without it, this forces
+        a new scan, e.g., on filesystems with coarse modification times.
+        """
+        global _MANIFEST_GENERATION
+
+        _SCAN_CACHE.clear()
+        _MANIFEST_GENERATION += 1
+
     def __init__(
-        self, folder: Path = Path(__file__).parent / "soundfiles", format: str = "wav"
+        self,
+        folder: Union[Path, str] = _DEFAULT_FOLDER,
+        format: str = "wav",
+        exclude_dirs: FrozenSet[str] = _EXCLUDE_DIRS,
+        manifest: Union[Path, str, None] = None,
     ):
         """
         Initialize a dataset from a given folder, including
@@ -31,21 +430,144 @@ class Dataset:
         Note: we sort files because directory traversal is
         not consistent accross OSes, and returning different
         file orderings may confuse students :'-).
+        Each class is sorted once, at scan time, on the raw path strings.
+
+        File paths are stored as plain strings in :attr:`files`,
+        and only converted to :class:`Path` objects on access.
+        The folder itself is only scanned on first access to :attr:`files`.
+
+        Scans are cached in memory, and optionally in a manifest file
+        shared between processes, and reused as long as none of the
+        scanned directories' modification times changed.
 
         :param folder: Where to find the soundfiles.
         :param format: The sound files format, use
             `'*'` to include all formats.
+        :param exclude_dirs: Directory names to skip, on top
+            of hidden directories, which are always skipped.
+        :param manifest: If set, the file where to persist the scan.
+            It must be outside the folder, as writing it would otherwise
+            change the folder's modification time.
+        """
+        self._folder = folder if isinstance(folder, Path) else Path(folder)
+        self._format = format
+        self._exclude_dirs = frozenset(exclude_dirs)
+        self._manifest = None if manifest is None else Path(manifest)
+        self._files: Optional[Dict[str, List[str]]] = None
+        self._paths: Optional[np.ndarray] = None
+        self._cls_ids: Optional[np.ndarray] = None
+        self._cls_names: Optional[np.ndarray] = None
+
+    def _scan(self) -> Dict[str, List[str]]:
+        """
+        Scan the dataset folder, or reuse a cached scan.
+
+        On a cache miss, the manifest file is read instead of walking
+        the folder, if it is up to date.
+
+        :return: A copy of the list of file paths, per class.
         """
-        files = {}
+        folder = self._folder
+        key = (str(folder.resolve()), self._format, self._exclude_dirs)
+        cached = _SCAN_CACHE.get(key)
 
-        for file in sorted(folder.glob("**/*." + format)):
-            cls = get_cls_from_path(file)
-            files.setdefault(cls, []).append(file)
+        if cached is None or not _is_up_to_date(folder, cached[0]):
+            manifest = self._manifest
+            manifest_key = _manifest_key(*key)
+            cached = None
 
-        self.files = files
-        self.nclass = len(files)
-        self.naudio = len(files[list(files.keys())[0]])
-        self.size = self.nclass * self.naudio
+            if manifest is not None:
+                cached = _read_manifest(manifest, folder, manifest_key)
+
+            if cached is None:
+                cached = _scan_folder(folder, self._format, self._exclude_dirs)
+
+                if manifest is not None:
+                    try:
+                        _write_manifest(manifest, folder, manifest_key, *cached)
+                    except OSError:  # Read-only location
+                        pass
+
+            _SCAN_CACHE[key] = cached
+
+        # Shallow copy, so that callers can't alter the cached scan
+        return {cls: list(cls_files) for cls, cls_files in cached[1].items()}
+
+    @property
+    def files(self) -> Dict[str, List[str]]:
+        """
+        The list of file paths, per class.
+
+        The folder is only scanned on first access.
+        """
+        if self._files is None:
+            self._files = self._scan()
+        return self._files
+
+    @property
+    def nclass(self) -> int:
+        """
+        The number of classes.
+        """
+        return len(self.files)
+
+    @property
+    def naudio(self) -> int:
+        """
+        The number of sounds in the first class.
+        """
+        return len(next(iter(self.files.values())))
+
+    @property
+    def size(self) -> int:
+        """
+        The number of sounds in the dataset, assuming balanced classes.
+        """
+        return self.nclass * self.naudio
+
+    def _build_index(self) -> None:
+        """
+        Flatten :attr:`files` into contiguous arrays, for vectorized sampling.
+
+        :attr:`_paths` holds all the file paths, class by class, and
+        :attr:`_cls_ids` the index of each path's class in :attr:`_cls_names`.
+        """
+        files = self.files
+        counts = [len(cls_files) for cls_files in files.values()]
+        self._cls_names = np.array(list(files.keys()), dtype=object)
+        self._paths = np.array(list(self.iter_paths_str()), dtype=object)
+        self._cls_ids = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+
+    def sample(self, n: int, replace: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw files uniformly at random from the whole dataset.
+
+        The flat index used for sampling is built on first call,
+        so later changes to :attr:`files` are not taken into account.
+
+        :param n: The number of files to draw.
+        :param replace: Whether to draw with replacement.
+        :return: The file paths, as strings, and their class names.
+        """
+        if self._paths is None:
+            self._build_index()
+
+        indices = np.random.choice(len(self._paths), size=n, replace=replace)
+        return self._paths[indices], self._cls_names[self._cls_ids[indices]]
+
+    def __reduce__(self):
+        """
+        Pickle only the dataset parameters, not the scanned files.
+
+        The folder is rescanned, lazily, when unpickling, which keeps
+        datasets cheap to send to worker processes.
+        """
+        return type(self), (
+            self._folder,
+            self._format,
+            self._exclude_dirs,
+            self._manifest,
+        )
 
     def __len__(self) -> int:
         """
@@ -62,7 +584,7 @@ class Dataset:
         :return: The file path.
         """
         cls, index = cls_index
-        return self.files[cls][index]
+        return Path(self.files[cls][index])
 
     def __getname__(self, cls_index: Tuple[str, int]) -> str:
         """
@@ -72,7 +594,32 @@ class Dataset:
         :return: The name of the sound.
         """
         cls, index = cls_index
-        return self.files[cls][index].stem
+        return Path(self.files[cls][index]).stem
+
+    def get(self, cls: str, index: int) -> Path:
+        """
+        Return the file path corresponding the
+        the (class name, index) pair.
+
+        Equivalent to `dataset[cls, index]`, without building a tuple.
+
+        :param cls: Class name.
+        :param index: Index.
+        :return: The file path.
+        """
+        return Path(self.files[cls][index])
+
+    def items_for(self, cls: str) -> List[str]:
+        """
+        Return the list of file paths, as strings, of a given class.
+
+        The list is not copied: fetch it once and index it locally
+        when sampling many files from the same class.
+
+        :param cls: Class name.
+        :return: The list of file paths.
+        """
+        return self.files[cls]
 
     def get_class_files(self, cls_name: str) -> List[Path]:
         """
@@ -81,7 +628,16 @@ class Dataset:
         :cls_name: Class name.
         :return: The list of file paths.
         """
-        return self.files[cls_name]
+        return [Path(file) for file in self.files[cls_name]]
+
+    def iter_paths_str(self) -> Iterator[str]:
+        """
+        Iterate over all the file paths, as strings, class by class.
+
+        :return: An iterator over the file paths.
+        """
+        for cls_files in self.files.values():
+            yield from cls_files
 
     def list_classes(self) -> List[str]:
         """
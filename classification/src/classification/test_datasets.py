@@ -0,0 +1,176 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from . import datasets
+from .datasets import _SCAN_CACHE, Dataset, _scan_folder, get_cls_from_path
+
+
+@pytest.fixture
+def folder(tmp_path: Path) -> Path:
+    folder = tmp_path / "data"
+    (folder / "sub").mkdir(parents=True)
+    for name in ["birds_01.wav", "birds_00.wav", "fire_00.wav", "notes.txt"]:
+        (folder / name).touch()
+    for name in ["fire_01.wav", "birds_02.wav"]:
+        (folder / "sub" / name).touch()
+    return folder
+
+
+def test_get_cls_from_path():
+    assert get_cls_from_path(Path("some/path/birds_01.wav")) == "birds"
+    assert get_cls_from_path(Path("some/path/chainsaw_12.ogg")) == "chainsaw"
+
+
+def test_dataset_scan(folder: Path):
+    dataset = Dataset(folder)
+
+    assert dataset.list_classes() == ["birds", "fire"]
+    assert dataset.get_class_files("birds") == [
+        folder / "birds_00.wav",
+        folder / "birds_01.wav",
+        folder / "sub" / "birds_02.wav",
+    ]
+    assert dataset["fire", 1] == folder / "sub" / "fire_01.wav"
+    assert dataset.get("fire", 1) == folder / "sub" / "fire_01.wav"
+    assert dataset.items_for("fire")[1] == str(folder / "sub" / "fire_01.wav")
+    assert dataset.__getname__(("fire", 0)) == "fire_00"
+
+
+def test_dataset_class_order(tmp_path: Path):
+    for name in ["fire_00.wav", "chainsaw_00.wav", "birds_01.wav", "birds_00.wav"]:
+        (tmp_path / name).touch()
+    dataset = Dataset(tmp_path)
+
+    assert dataset.list_classes() == ["birds", "chainsaw", "fire"]
+    assert dataset.naudio == 2
+
+
+def test_dataset_str_folder(folder: Path):
+    dataset = Dataset(str(folder))
+
+    assert dataset["birds", 0] == folder / "birds_00.wav"
+
+
+def test_dataset_all_formats(folder: Path):
+    dataset = Dataset(folder, format="*")
+
+    assert dataset.list_classes() == ["birds", "fire", "notes"]
+
+
+def test_dataset_cache(folder: Path):
+    dataset = Dataset(folder)
+    dataset.files["birds"].clear()
+
+    assert len(Dataset(folder).get_class_files("birds")) == 3
+
+    # Nested changes invalidate the cached scan
+    (folder / "sub" / "birds_03.wav").touch()
+
+    assert len(Dataset(folder).get_class_files("birds")) == 4
+
+    (folder / "sub" / "birds_03.wav").unlink()
+
+    assert len(Dataset(folder).get_class_files("birds")) == 3
+
+
+def test_dataset_iter_paths_str(folder: Path):
+    dataset = Dataset(folder)
+
+    assert sorted(dataset.iter_paths_str()) == sorted(
+        str(file) for file in folder.rglob("*.wav")
+    )
+
+
+def test_dataset_lazy_scan(tmp_path: Path):
+    dataset = Dataset(tmp_path)
+    (tmp_path / "birds_00.wav").touch()
+
+    assert dataset.list_classes() == ["birds"]
+    assert len(dataset) == 1
+
+
+def test_dataset_sample(folder: Path):
+    dataset = Dataset(folder)
+    paths, classes = dataset.sample(5, replace=False)
+
+    assert sorted(paths) == sorted(dataset.iter_paths_str())
+    for path, cls in zip(paths, classes):
+        assert get_cls_from_path(Path(path)) == cls
+
+
+def test_dataset_exclude_dirs(folder: Path):
+    for name in [".hidden", "__pycache__", "skip"]:
+        (folder / "sub" / name).mkdir()
+        (folder / "sub" / name / "birds_10.wav").touch()
+
+    assert len(Dataset(folder).get_class_files("birds")) == 4
+    assert len(Dataset(folder, exclude_dirs={"skip"}).get_class_files("birds")) == 4
+    assert len(Dataset(folder, exclude_dirs=set()).get_class_files("birds")) == 5
+
+
+def test_dataset_pickle(folder: Path):
+    dataset = Dataset(folder)
+    dataset.files  # noqa: B018
+
+    unpickled = pickle.loads(pickle.dumps(dataset))
+
+    assert unpickled._files is None
+    assert unpickled.files == dataset.files
+
+
+def test_dataset_manifest(folder: Path, monkeypatch: pytest.MonkeyPatch):
+    manifest = folder.parent / "manifest"
+    contents = sorted(folder.rglob("*"))
+    Dataset(folder, manifest=manifest).files  # noqa: B018
+
+    assert manifest.stat().st_size > 0
+    assert sorted(folder.rglob("*")) == contents
+
+    # Without the in-memory cache, the manifest is reused
+    _SCAN_CACHE.clear()
+    with monkeypatch.context() as m:
+        m.setattr(datasets, "_scan_folder", None)
+
+        assert Dataset(folder, manifest=manifest).items_for("birds") == [
+            str(folder / "birds_00.wav"),
+            str(folder / "birds_01.wav"),
+            str(folder / "sub" / "birds_02.wav"),
+        ]
+
+    # Nested changes invalidate the manifest
+    (folder / "sub" / "birds_03.wav").touch()
+    _SCAN_CACHE.clear()
+
+    assert len(Dataset(folder, manifest=manifest).get_class_files("birds")) == 4
+
+    assert sorted(folder.parent.iterdir()) == [folder, manifest]
+
+    # Invalidating the cache ignores the manifest, but does not delete it
+    Dataset.invalidate_cache()
+
+    assert manifest.exists()
+
+    scans = []
+    with monkeypatch.context() as m:
+        m.setattr(
+            datasets,
+            "_scan_folder",
+            lambda *args: scans.append(args) or _scan_folder(*args),
+        )
+
+        assert len(Dataset(folder, manifest=manifest).get_class_files("birds")) == 4
+        assert len(scans) == 1
+
+
+def test_dataset_manifest_undecodable_name(folder: Path):
+    manifest = folder.parent / "manifest"
+    # Not valid UTF-8, such names are decoded with surrogate escapes
+    name = os.fsdecode(b"birds_\xff.wav")
+    (folder / name).touch()
+    Dataset(folder, manifest=manifest).files  # noqa: B018
+    _SCAN_CACHE.clear()
+
+    assert folder / name in Dataset(folder, manifest=manifest).get_class_files("birds")
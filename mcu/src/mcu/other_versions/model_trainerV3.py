@@ -8,21 +8,36 @@ print("Launching Model Trainer... This may take a few seconds.")
 
 ####################################################################################################
 # Standard library imports
+import ast
+import hashlib
+import importlib
+import logging
 import os
+import shutil
 import sys
-from typing import Dict, List, Tuple, Type
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial, wraps
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple, Type
 
 import librosa
+import numba
 import numpy as np
+import soundfile as sf
+from joblib import Parallel, delayed, parallel_backend
 from PyQt6.QtCore import (
+    QAbstractTableModel,  # Base class of flat table models
     QModelIndex,  # Data index for model views
+    QSignalBlocker,  # Temporarily blocks an object's signals
     Qt,  # Core Qt namespace (common enums)
     QThread,  # Worker thread for long tasks
+    QTimer,  # Single-shot or repeating timer
+    pyqtSignal,  # Signal emitted across threads
 )
 from PyQt6.QtGui import (
     QBrush,  # Paint style for elements
     QColor,  # Color value (RGB/HSV)
-    QPainter,  # Low-level 2D painting
 )
 
 # GUI imports
@@ -45,182 +60,194 @@ from PyQt6.QtWidgets import (
     QPushButton,  # Clickable button
     QScrollArea,  # Scrollable container
     QSpinBox,  # Integer input spinner
-    QStyledItemDelegate,  # Custom item renderer
-    QStyleOptionViewItem,  # Style options for items
     # Advanced
     QTabWidget,  # Tabbed interface
     QTextEdit,  # Rich text editor
+    QTreeView,  # Hierarchical view of an item model
     QTreeWidget,  # Hierarchical tree view
     QTreeWidgetItem,  # Item for QTreeWidget
     # ===== LAYOUTS ===== (Used to organize widgets, not widgets themselves)
     QVBoxLayout,  # Vertical box layout
     QWidget,  # Base container for all widgets
 )
-from sklearn.discriminant_analysis import (
-    LinearDiscriminantAnalysis,
-    QuadraticDiscriminantAnalysis,
-)
-from sklearn.ensemble import (
-    AdaBoostClassifier,
-    BaggingClassifier,
-    ExtraTreesClassifier,
-    GradientBoostingClassifier,
-    HistGradientBoostingClassifier,
-    RandomForestClassifier,
-)
-from sklearn.gaussian_process import GaussianProcessClassifier
+from scipy.signal import resample_poly
 
 ####################################################################################################
-# Model training imports
-from sklearn.linear_model import (
-    LogisticRegression,
-    PassiveAggressiveClassifier,
-    Perceptron,
-    RidgeClassifier,
-    SGDClassifier,
-)
+# Model training imports (the models themselves are imported lazily, see resolve_model_class)
+try:  # FFTW with cached plans for librosa's STFTs, when installed (pip install pyfftw)
+    import pyfftw
 
-# Third party imports
-from sklearn.model_selection import train_test_split
-from sklearn.naive_bayes import BernoulliNB, ComplementNB, GaussianNB, MultinomialNB
-from sklearn.neighbors import (
-    KNeighborsClassifier,
-    NearestCentroid,
-    RadiusNeighborsClassifier,
-)
-from sklearn.neural_network import MLPClassifier
-from sklearn.svm import SVC, LinearSVC, NuSVC
-from sklearn.tree import DecisionTreeClassifier
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    librosa.set_fftlib(pyfftw.interfaces.numpy_fft)
+except ImportError:
+    pass
 
 ####################################################################################################
 # Models and constants
 
 models_dict: Dict[
-    str, Dict[str, Tuple[Type, str]]
+    str, Dict[str, Tuple[str, str, str]]  # Module, class name, description
 ] = {  # Generated by DeepSeek-R1:32B under the MIT liscence
     "Linear Models": {
         "Logistic Regression": (
-            LogisticRegression,
+            "sklearn.linear_model",
+            "LogisticRegression",
             "Linear model for logistic regression classification",
         ),
         "Stochastic Gradient Descent": (
-            SGDClassifier,
+            "sklearn.linear_model",
+            "SGDClassifier",
             "Linear classifier with SGD training and regularization",
         ),
         "Ridge Classifier": (
-            RidgeClassifier,
+            "sklearn.linear_model",
+            "RidgeClassifier",
             "Classifier using ridge regression with thresholding",
         ),
         "Passive-Aggressive": (
-            PassiveAggressiveClassifier,
+            "sklearn.linear_model",
+            "PassiveAggressiveClassifier",
             "Online learning algorithm for large-scale learning",
         ),
-        "Perceptron": (Perceptron, "Simple linear algorithm for binary classification"),
+        "Perceptron": (
+            "sklearn.linear_model",
+            "Perceptron",
+            "Simple linear algorithm for binary classification",
+        ),
     },
     "Support Vector Machines": {
         "Support Vector Machine (SVC)": (
-            SVC,
+            "sklearn.svm",
+            "SVC",
             "C-support vector classification with kernel trick",
         ),
         "Nu-Support Vector Machine": (
-            NuSVC,
+            "sklearn.svm",
+            "NuSVC",
             "Nu-support vector classification with margin control",
         ),
         "Linear Support Vector Machine": (
-            LinearSVC,
+            "sklearn.svm",
+            "LinearSVC",
             "Linear support vector classification optimized for speed",
         ),
     },
     "Tree-based Models": {
         "Decision Tree": (
-            DecisionTreeClassifier,
+            "sklearn.tree",
+            "DecisionTreeClassifier",
             "Non-linear model using recursive partitioning",
         ),
         "Random Forest": (
-            RandomForestClassifier,
+            "sklearn.ensemble",
+            "RandomForestClassifier",
             "Ensemble of decorrelated decision trees with bagging",
         ),
         "Extra Trees": (
-            ExtraTreesClassifier,
+            "sklearn.ensemble",
+            "ExtraTreesClassifier",
             "Extremely randomized trees ensemble with reduced variance",
         ),
     },
     "Boosting Models": {
         "Gradient Boosting": (
-            GradientBoostingClassifier,
+            "sklearn.ensemble",
+            "GradientBoostingClassifier",
             "Sequential ensemble with gradient descent optimization",
         ),
         "Histogram Gradient Boosting": (
-            HistGradientBoostingClassifier,
+            "sklearn.ensemble",
+            "HistGradientBoostingClassifier",
             "Efficient GB implementation using histograms",
         ),
         "AdaBoost": (
-            AdaBoostClassifier,
+            "sklearn.ensemble",
+            "AdaBoostClassifier",
             "Adaptive boosting with emphasis on misclassified samples",
         ),
     },
     "Ensemble Methods": {
         "Bagging": (
-            BaggingClassifier,
+            "sklearn.ensemble",
+            "BaggingClassifier",
             "Meta-estimator for bagging-based ensemble learning",
         )
     },
     "Naive Bayes Models": {
         "Gaussian Naive Bayes": (
-            GaussianNB,
+            "sklearn.naive_bayes",
+            "GaussianNB",
             "Gaussian likelihood with naive independence assumption",
         ),
         "Bernoulli Naive Bayes": (
-            BernoulliNB,
+            "sklearn.naive_bayes",
+            "BernoulliNB",
             "Bernoulli distribution for binary/boolean features",
         ),
         "Multinomial Naive Bayes": (
-            MultinomialNB,
+            "sklearn.naive_bayes",
+            "MultinomialNB",
             "Multinomial distribution for count-based features",
         ),
         "Complement Naive Bayes": (
-            ComplementNB,
+            "sklearn.naive_bayes",
+            "ComplementNB",
             "Adaptation of MultinomialNB for imbalanced datasets",
         ),
     },
     "Nearest Neighbors": {
         "k-Nearest Neighbors": (
-            KNeighborsClassifier,
+            "sklearn.neighbors",
+            "KNeighborsClassifier",
             "Instance-based learning using k-nearest neighbors vote",
         ),
         "Radius Neighbors": (
-            RadiusNeighborsClassifier,
+            "sklearn.neighbors",
+            "RadiusNeighborsClassifier",
             "Neighbors within fixed radius for classification",
         ),
         "Nearest Centroid": (
-            NearestCentroid,
+            "sklearn.neighbors",
+            "NearestCentroid",
             "Simple classifier based on centroid distances",
         ),
     },
     "Discriminant Analysis": {
         "Linear Discriminant Analysis": (
-            LinearDiscriminantAnalysis,
+            "sklearn.discriminant_analysis",
+            "LinearDiscriminantAnalysis",
             "Linear decision boundaries from class statistics",
         ),
         "Quadratic Discriminant Analysis": (
-            QuadraticDiscriminantAnalysis,
+            "sklearn.discriminant_analysis",
+            "QuadraticDiscriminantAnalysis",
             "Quadratic decision boundaries for classification",
         ),
     },
     "Neural Networks": {
         "Multilayer Perceptron": (
-            MLPClassifier,
+            "sklearn.neural_network",
+            "MLPClassifier",
             "Feedforward artificial neural network classifier",
         )
     },
     "Probabilistic Models": {
         "Gaussian Process": (
-            GaussianProcessClassifier,
+            "sklearn.gaussian_process",
+            "GaussianProcessClassifier",
             "Probabilistic classifier based on Gaussian processes",
         )
     },
 }
 
+# Module and class name of each model, by model name
+model_classes_by_name = {
+    model_name: (module_name, class_name)
+    for model_dict in models_dict.values()
+    for model_name, (module_name, class_name, _) in model_dict.items()
+}
+
 # Classification classes for the dataset (Not are needed to be used, only those that are setup, will then be used and saved)
 classification_classes = [
     "Unknown",
@@ -232,6 +259,9 @@ classification_classes = [
     "Human Voice",
     "Howling Leaves",
 ]
+classification_ids = {
+    classification: i for i, classification in enumerate(classification_classes)
+}
 
 # Default model parameters for eacch model, if its not present, the default parameters will be used
 model_params_per_path = {
@@ -246,10 +276,536 @@ model_params_per_path = {
     },
 }
 
+# Models whose fit holds the GIL, they are trained in separate processes instead of threads
+gil_bound_models = {"GaussianNB", "KNeighborsClassifier", "RadiusNeighborsClassifier"}
+
+# Models fitted from additive per-class statistics, their folds are cross-validated by subtraction
+additive_models = {"GaussianNB", "MultinomialNB", "NearestCentroid"}
+
+# On-disk cache of the MEL spectrograms computed from audio files (.npy), loaded back memory-mapped.
+# Next to this script, so that it does not depend on the working directory
+mel_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".mel_cache")
+
+# Parameters of the MEL spectrograms computed from audio files (part of their cache key)
+mel_params = {"sr": 22050, "n_fft": 2048, "hop_length": 512, "n_mels": 128}
+
+# Set TRAINER_PROFILE=1 to time the training phases, or TRAINER_PROFILE=full to also profile
+# each training launch (with pyinstrument if installed, cProfile otherwise)
+PROFILE = os.environ.get("TRAINER_PROFILE")
+profile_timings: List[Tuple[str, int]] = []  # Function name, duration (ns)
+logger = logging.getLogger("ModelTrainer")
+
 ####################################################################################################
 # Application logic
 
-# Use process pools to parallelize training if needed (each job runs in a separate process)
+
+def profiled(func):
+    """
+    Record the duration of each call of a function when profiling is enabled (see PROFILE).
+    Calls made in worker processes are not recorded, they have their own copy of the timings.
+    """
+    if not PROFILE:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile_timings.append((func.__qualname__, time.perf_counter_ns() - start))
+
+    return wrapper
+
+
+def sampled(func):
+    """Run each call of a function under a profiler and print its report, when PROFILE is 'full'"""
+    if PROFILE != "full":
+        return profiled(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            from pyinstrument import Profiler  # Cheap sampling profiler, optional
+        except ImportError:
+            import cProfile
+            import pstats
+
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            profiler.print()
+
+    return profiled(wrapper)
+
+
+def print_profile_timings():
+    """Log the recorded durations, grouped by function"""
+    totals: Dict[str, List[int]] = {}
+    for name, duration in profile_timings:
+        totals.setdefault(name, []).append(duration)
+    lines = [f"{'Function':<40} {'Calls':>8} {'Total (ms)':>12} {'Mean (ms)':>12}"]
+    for name, durations in sorted(totals.items(), key=lambda item: -sum(item[1])):
+        total = sum(durations) / 1e6
+        lines.append(
+            f"{name:<40} {len(durations):>8} {total:>12.2f} {total / len(durations):>12.3f}"
+        )
+    logger.info("Profile timings:\n%s", "\n".join(lines))
+
+
+@lru_cache(maxsize=None)
+def patch_sklearn_once():
+    """
+    Replace scikit-learn's estimators by Intel's oneDAL backed ones, when installed
+    (pip install scikit-learn-intelex). Applied on first use, as it imports scikit-learn
+    """
+    try:
+        from sklearnex import patch_sklearn
+    except ImportError:
+        return
+    patch_sklearn()
+
+
+def resolve_model_class(module_name: str, class_name: str) -> Type:
+    """Import a model class, only when it is actually needed"""
+    patch_sklearn_once()  # Before the import, so that the patched class is resolved
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+@lru_cache(maxsize=None)
+def classification_palette() -> Tuple[Tuple[QBrush, QBrush], ...]:
+    """
+    (Odd row, even row) brushes of each classification, indexed by classification_ids,
+    with white brushes last for unknown classifications. Built on first use, once the QApplication exists.
+    """
+    colors = [
+        QColor.fromHsv(360 * i // len(classification_classes), 20, 255)
+        for i in range(len(classification_classes))
+    ]
+    colors.append(QColor(255, 255, 255))
+    return tuple((QBrush(color), QBrush(color.lighter(103))) for color in colors)
+
+
+class FileListModel(QAbstractTableModel):
+    """
+    Flat (file name, classification, path) model of the dataset files, stored as three
+    parallel arrays instead of one QTreeWidgetItem per file, so that only the visible rows
+    are ever materialized by the view
+    """
+
+    def __init__(self, header_labels: List[str], parent=None):
+        super().__init__(parent)
+        self.header_labels = header_labels
+        self.names = np.empty(0, dtype=object)
+        self.class_ids = np.empty(0, dtype=np.int8)
+        self.paths = np.empty(0, dtype=object)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.header_labels)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if column != 1:
+                return None
+            # Color the classification, slightly lighter on every other row
+            brush, lighter_brush = classification_palette()[self.class_ids[row]]
+            return brush if row % 2 else lighter_brush
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        if column == 0:
+            return self.names[row]
+        if column == 1:
+            return classification_classes[self.class_ids[row]]
+        return self.paths[row]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.header_labels[section]
+        return None
+
+    def add_files(self, files: List[str], append: bool = True):
+        """Add (unclassified) files to the model, or replace its files"""
+        names = np.array([os.path.basename(file) for file in files], dtype=object)
+        paths = np.array(files, dtype=object)
+        class_ids = np.full(len(files), classification_ids["Unknown"], dtype=np.int8)
+        self.beginResetModel()
+        if append:
+            self.names = np.concatenate([self.names, names])
+            self.class_ids = np.concatenate([self.class_ids, class_ids])
+            self.paths = np.concatenate([self.paths, paths])
+        else:
+            self.names, self.class_ids, self.paths = names, class_ids, paths
+        self.endResetModel()
+
+    def clear(self):
+        """Remove all the files"""
+        self.add_files([], append=False)
+
+    def set_classification(self, rows: List[int], classification: str):
+        """Assign a classification to some rows"""
+        if not rows:
+            return
+        self.class_ids[rows] = classification_ids[classification]
+        self.dataChanged.emit(self.index(min(rows), 1), self.index(max(rows), 1))
+
+    def snapshot(self) -> List[Tuple[str, str]]:
+        """The (path, classification) of every file, as plain picklable tuples"""
+        return [
+            (path, classification_classes[class_id])
+            for path, class_id in zip(self.paths.tolist(), self.class_ids.tolist())
+        ]
+
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    Cheap fingerprint of a file, from its resolved path, modification time and size:
+    any rewrite of the file changes it, without reading the file itself
+    """
+    stat = os.stat(file_path)
+    key = f"{os.path.realpath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def mel_cache_path(audio_file: str) -> str:
+    """Path of the cached MEL spectrogram of an audio file, keyed by its fingerprint and the MEL parameters"""
+    key = f"{file_fingerprint(audio_file)}|{sorted(mel_params.items())}"
+    return os.path.join(
+        mel_cache_dir,
+        hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ".npy",
+    )
+
+
+def load_audio(audio_file: str, sr: int) -> np.ndarray:
+    """Load an audio file as a mono float32 waveform at the sample rate sr"""
+    try:
+        audio_data, file_sr = sf.read(audio_file, dtype="float32", always_2d=True)
+    except RuntimeError:  # Format not supported by libsndfile
+        return librosa.load(audio_file, sr=sr)[0]
+    audio_data = audio_data.mean(axis=1)
+    if file_sr != sr:
+        divisor = np.gcd(sr, file_sr)
+        audio_data = resample_poly(audio_data, sr // divisor, file_sr // divisor)
+    return audio_data.astype(np.float32, copy=False)
+
+
+@lru_cache(maxsize=None)
+def mel_filterbank(sr: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """MEL filterbank matrix (n_mels, 1 + n_fft // 2), built once per process and parameters"""
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+
+
+def compute_mels(audio_datas: List[np.ndarray]) -> List[np.ndarray]:
+    """Compute the MEL spectrograms of waveforms, those of equal length are batched into a single call"""
+    mel_datas = [None] * len(audio_datas)
+    indices_by_length: Dict[int, List[int]] = {}
+    for i, audio_data in enumerate(audio_datas):
+        indices_by_length.setdefault(len(audio_data), []).append(i)
+    for indices in indices_by_length.values():
+        batch = np.stack([audio_datas[i] for i in indices]).astype(
+            np.float32, copy=False
+        )
+        stft = librosa.stft(
+            batch, n_fft=mel_params["n_fft"], hop_length=mel_params["hop_length"]
+        )
+        power = stft.real**2 + stft.imag**2  # |stft|^2, without the square root
+        filterbank = mel_filterbank(
+            mel_params["sr"], mel_params["n_fft"], mel_params["n_mels"]
+        )
+        batch_mels = filterbank @ power  # A single batched sgemm
+        # TODO: Add signal processing here
+        for i, mel_data in zip(indices, batch_mels):
+            mel_datas[i] = mel_data.astype(np.float32, copy=False)
+    return mel_datas
+
+
+@profiled
+def process_audio_batch(
+    audio_files: List[str], use_cache: bool = True
+) -> List[np.ndarray]:
+    """Process audio files into MEL spectrograms (cached on disk, unless use_cache is False)"""
+    mel_datas = [None] * len(audio_files)
+    missing = []
+    for i, audio_file in enumerate(audio_files):
+        if use_cache and os.path.exists(cache_path := mel_cache_path(audio_file)):
+            mel_datas[i] = np.load(cache_path, mmap_mode="r", allow_pickle=False)
+        else:
+            missing.append(i)
+    audio_datas = [load_audio(audio_files[i], mel_params["sr"]) for i in missing]
+    for i, mel_data in zip(missing, compute_mels(audio_datas)):
+        if use_cache:
+            # Written under a temporary name first, so that a partial file is never read
+            cache_path = mel_cache_path(audio_files[i])
+            os.makedirs(mel_cache_dir, exist_ok=True)
+            with open(f"{cache_path}.{os.getpid()}.tmp", "wb") as file:
+                np.save(file, mel_data, allow_pickle=False)
+            os.replace(file.name, cache_path)
+        mel_datas[i] = mel_data
+    return mel_datas
+
+
+def process_audio(audio_file: str, use_cache: bool = True) -> np.ndarray:
+    """Process an audio file into a MEL spectrogram (cached on disk, unless use_cache is False)"""
+    return process_audio_batch([audio_file], use_cache)[0]
+
+
+@profiled
+def load_mel(mel_file: str) -> np.ndarray:
+    """Load a MEL spectrogram from a file, memory-mapped so that pages are only read when used"""
+    mel_data = np.load(mel_file, mmap_mode="r", allow_pickle=False)
+    return mel_data
+
+
+def load_mels(
+    mel_files: List[str], executor: ThreadPoolExecutor
+) -> Sequence[np.ndarray]:
+    """
+    Load MEL spectrograms, copied into a single preallocated float32 array when they all have
+    the same shape (one contiguous buffer, instead of one memory mapping per file)
+    """
+    mels = list(executor.map(load_mel, mel_files))
+    if not mels or any(mel.shape != mels[0].shape for mel in mels):
+        return mels
+    stacked_mels = np.empty((len(mels),) + mels[0].shape, dtype=np.float32)
+    list(executor.map(stacked_mels.__setitem__, range(len(mels)), mels))
+    return stacked_mels
+
+
+@lru_cache(maxsize=None)
+def feature_extractor(out_size: int, out_len: int):
+    """
+    Compile a MEL to feature function specialized for an output shape: the shape is a
+    compile-time constant of the kernel, so Numba can fold it into the pooling loops.
+    The function mean-pools a MEL spectrogram to (out_size, out_len), in place of a
+    preallocated feature array. The values are only averaged, so non-negative MELs give
+    non-negative features (as required by the multinomial and complement naive Bayes models)
+    """
+
+    @numba.njit(cache=True, fastmath=True)
+    def mel_to_feature(mel_data: np.ndarray, feature: np.ndarray) -> np.ndarray:
+        n_mels, n_frames = mel_data.shape
+        for j in range(out_len):
+            t0 = j * n_frames // out_len
+            t1 = max((j + 1) * n_frames // out_len, t0 + 1)
+            for i in range(out_size):
+                m0 = i * n_mels // out_size
+                m1 = max((i + 1) * n_mels // out_size, m0 + 1)
+                total = 0.0
+                for m in range(m0, m1):
+                    for t in range(t0, t1):
+                        total += mel_data[m, t]
+                feature[i, j] = total / ((m1 - m0) * (t1 - t0))
+        return feature
+
+    return mel_to_feature
+
+
+def split_indices(
+    n_samples: int,
+    test_size: float,
+    random_state: int,
+    stratify: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Randomly split the sample indices into training and testing indices.
+    If stratify (the labels) is given, each class is split with the same proportions,
+    keeping at least one sample of each class in the training set.
+    """
+    rng = np.random.default_rng(random_state)
+    indices = rng.permutation(n_samples)
+    if stratify is None:
+        n_test = int(np.ceil(test_size * n_samples))
+        return indices[n_test:], indices[:n_test]
+    # Stable sort of the shuffled indices by class: each class is a contiguous, shuffled run,
+    # whose first samples go to the testing set
+    _, class_ids, counts = np.unique(stratify, return_inverse=True, return_counts=True)
+    indices = indices[np.argsort(class_ids[indices], kind="stable")]
+    starts = np.cumsum(counts) - counts
+    n_tests = np.clip(np.ceil(test_size * counts).astype(np.int64), 0, counts - 1)
+    is_test = np.arange(n_samples) - np.repeat(starts, counts) < np.repeat(
+        n_tests, counts
+    )
+    return indices[~is_test], indices[is_test]
+
+
+def additive_cv_score(class_name: str, X: np.ndarray, y: np.ndarray, folds) -> float:
+    """
+    Cross-validated accuracy of an additive-statistics model (see additive_models).
+    The per-class sums are computed once, and each fold's training statistics are derived
+    by subtracting the fold's own sums, instead of refitting the model k times.
+    """
+    classes, y_ids = np.unique(y, return_inverse=True)
+    X = X.astype(np.float64)
+
+    def class_sums(indices):
+        """Per-class sample counts, sums and sums of squares of a subset of the samples"""
+        one_hot = np.zeros((len(indices), len(classes)))
+        one_hot[np.arange(len(indices)), y_ids[indices]] = 1.0
+        X_subset = X[indices]
+        return (
+            one_hot.sum(axis=0),
+            one_hot.T @ X_subset,
+            one_hot.T @ (X_subset * X_subset),
+        )
+
+    total_count, total_sum, total_sum2 = class_sums(np.arange(len(y)))
+    scores = []
+    for train_indices, test_indices in folds.split(X, y):
+        fold_count, fold_sum, fold_sum2 = class_sums(test_indices)
+        count = total_count - fold_count
+        present = count > 0
+        count_, sum_ = count[present, None], (total_sum - fold_sum)[present]
+        X_test = X[test_indices]
+        if class_name == "NearestCentroid":
+            centroids = sum_ / count_
+            distances = (
+                (X_test * X_test).sum(axis=1, keepdims=True)
+                - 2 * X_test @ centroids.T
+                + (centroids * centroids).sum(axis=1)
+            )
+            predictions = distances.argmin(axis=1)
+        elif class_name == "GaussianNB":
+            # Same variance smoothing as scikit-learn's GaussianNB (var_smoothing=1e-9)
+            X_train = X[train_indices]
+            epsilon = 1e-9 * X_train.var(axis=0).max()
+            mean = sum_ / count_
+            var = (total_sum2 - fold_sum2)[present] / count_ - mean * mean + epsilon
+            joint_log_likelihood = (
+                np.log(count[present] / count.sum())
+                - 0.5 * np.log(2.0 * np.pi * var).sum(axis=1)
+                - 0.5 * (((X_test[:, None, :] - mean) ** 2) / var).sum(axis=2)
+            )
+            predictions = joint_log_likelihood.argmax(axis=1)
+        else:  # MultinomialNB (alpha=1.0)
+            if X.min() < 0:  # Same check as scikit-learn's MultinomialNB
+                raise ValueError("Negative values in data passed to MultinomialNB")
+            feature_log_prob = np.log(sum_ + 1.0) - np.log(
+                (sum_ + 1.0).sum(axis=1, keepdims=True)
+            )
+            predictions = (
+                np.log(count[present] / count.sum()) + X_test @ feature_log_prob.T
+            ).argmax(axis=1)
+        scores.append(
+            np.mean(np.flatnonzero(present)[predictions] == y_ids[test_indices])
+        )
+    return float(np.mean(scores))
+
+
+@profiled
+def fit_model(
+    model_name: str,
+    model_class: Type,
+    X_train,
+    X_test,
+    y_train,
+    y_test,
+    cv_folds: int = 0,
+) -> Tuple[str, float, float, Optional[str]]:
+    """
+    Fit a model on the training set and return its accuracy on the testing set,
+    and its cross-validated accuracy on the training set (NaN if cv_folds < 2).
+    If the model fails (e.g. it does not support the features), the accuracies are NaN
+    and the error is returned instead of raised, so that the other models are still trained
+    """
+    try:
+        model_instance = model_class()
+        model_instance.fit(X_train, y_train)
+        cv_accuracy = float("nan")
+        if cv_folds >= 2:
+            # Imported lazily like the models, only when cross-validating
+            from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+            folds = StratifiedKFold(cv_folds, shuffle=True, random_state=0)
+            if model_class.__name__ in additive_models:
+                cv_accuracy = additive_cv_score(
+                    model_class.__name__, X_train, y_train, folds
+                )
+            else:
+                cv_accuracy = cross_val_score(
+                    model_class(), X_train, y_train, cv=folds
+                ).mean()
+        accuracy = model_instance.score(X_test, y_test)
+    except Exception as error:
+        nan = float("nan")
+        return model_name, nan, nan, f"{type(error).__name__}: {error}"
+    return model_name, accuracy, cv_accuracy, None
+
+
+class TrainingWorker(QThread):
+    """Worker thread that trains several models in parallel, without blocking the GUI"""
+
+    model_trained = pyqtSignal(str, float, float)  # Model name, accuracy, CV accuracy
+    model_failed = pyqtSignal(str, str)  # Model name, error message
+
+    def __init__(
+        self,
+        models: List[Tuple[str, Type]],
+        X_train,
+        X_test,
+        y_train,
+        y_test,
+        cv_folds: int = 0,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.models = models
+        self.cv_folds = cv_folds
+        # Contiguous float32 features halve the memory traffic of the fits, and avoid
+        # scikit-learn's own conversion copy in each worker
+        self.dataset = (
+            np.ascontiguousarray(X_train, dtype=np.float32),
+            np.ascontiguousarray(X_test, dtype=np.float32),
+            y_train,
+            y_test,
+        )
+
+    def run(self):
+        # Most scikit-learn fits release the GIL, so threads are enough (and share the dataset)
+        thread_models = [
+            m for m in self.models if m[1].__name__ not in gil_bound_models
+        ]
+        process_models = [m for m in self.models if m[1].__name__ in gil_bound_models]
+        for backend, models in (("threading", thread_models), ("loky", process_models)):
+            if not models:
+                continue
+            # The context manager also applies to scikit-learn's internal parallelism (n_jobs),
+            # and the process workers memory-map the dataset instead of copying it.
+            # Each result is reported as soon as its model is trained, whatever the order
+            pending = {model_name for model_name, _ in models}
+            try:
+                with parallel_backend(backend, n_jobs=-1):
+                    results = Parallel(mmap_mode="r", return_as="generator_unordered")(
+                        delayed(fit_model)(
+                            model_name, model_class, *self.dataset, self.cv_folds
+                        )
+                        for model_name, model_class in models
+                    )
+                    for model_name, accuracy, cv_accuracy, error in results:
+                        pending.discard(model_name)
+                        if error is None:
+                            self.model_trained.emit(model_name, accuracy, cv_accuracy)
+                        else:
+                            self.model_failed.emit(model_name, error)
+            # The backend itself failed (e.g. a worker process crashed)
+            except Exception as error:
+                for model_name in pending:
+                    self.model_failed.emit(
+                        model_name, f"{type(error).__name__}: {error}"
+                    )
 
 
 class ModelTrainerApp(QMainWindow):
@@ -268,9 +824,6 @@ class ModelTrainerApp(QMainWindow):
             dock = QDockWidget(name, self)
             dock.setWidget(widget)
             dock.setFeatures(features)
-
-            # Style the dock (border, title bar)
-            dock.setStyleSheet("QDockWidget { border: 1px solid #a0a0a0; }")
             return dock
 
         # Make the widgets
@@ -330,6 +883,9 @@ class ModelTrainerApp(QMainWindow):
             Qt.Orientation.Vertical,
         )
 
+        # Keep a reference to the running training workers
+        self.training_workers: List[TrainingWorker] = []
+
         # Generate the rest of the UI
         self.gen_top1()
         self.gen_top2()
@@ -362,18 +918,23 @@ class ModelTrainerApp(QMainWindow):
         def color_line(tree_item: QTreeWidgetItem, color: QColor):
             [tree_item.setBackground(i, QBrush(color)) for i in range(2)]
 
+        type_items = []
         for model_type, model_dict in models_dict.items():
             type_item = QTreeWidgetItem([model_type, ""])
             color_line(type_item, QColor(255, 230, 255))  # Light purple
             type_item.setFlags(type_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
-            type_item.setFirstColumnSpanned(True)
             type_item.setToolTip(0, model_type)
-            self.top1_tree.addTopLevelItem(type_item)
-            for model_name, (model_class, model_description) in model_dict.items():
+            model_items = []
+            for model_name, (_, _, model_description) in model_dict.items():
                 model_item = QTreeWidgetItem([model_name, model_description])
                 model_item.setToolTip(0, model_name)
                 model_item.setToolTip(1, model_description)
-                type_item.addChild(model_item)
+                model_items.append(model_item)
+            type_item.addChildren(model_items)
+            type_items.append(type_item)
+        self.add_tree_items(self.top1_tree, type_items)
+        for type_item in type_items:
+            type_item.setFirstColumnSpanned(True)  # Only works once in the tree
         self.top1_tree.expandAll()
 
         # Make the tree connections to the tools
@@ -401,41 +962,28 @@ class ModelTrainerApp(QMainWindow):
         self.top1_select_all.clicked.connect(select_all)
         self.top1_deselect_all.clicked.connect(deselect_all)
 
-    def file_tree_configure(self, tree: QTreeWidget, header_labels: List[str]):
-        """Configure a tree widget with alternating colors and header labels"""
-        tree.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
-        # tree.setDragDropMode(QTreeWidget.DragDropMode.InternalMove)
+    def add_tree_items(self, tree: QTreeWidget, items: List[QTreeWidgetItem]):
+        """Add top level items to a tree in a single batch, without intermediate updates"""
+        tree.setUpdatesEnabled(False)
+        with QSignalBlocker(tree):
+            tree.addTopLevelItems(items)
+        tree.setUpdatesEnabled(True)
+
+    def file_tree_configure(self, tree: QTreeView, header_labels: List[str]):
+        """Configure a file tree view with its model, alternating colors and header labels"""
+        tree.setModel(FileListModel(header_labels, tree))
+        tree.setSelectionMode(QTreeView.SelectionMode.ExtendedSelection)
+        tree.setRootIsDecorated(False)
+        tree.setUniformRowHeights(
+            True
+        )  # Rows are all the same height, no need to measure them
+        # tree.setDragDropMode(QTreeView.DragDropMode.InternalMove)
         # tree.setDefaultDropAction(Qt.DropAction.MoveAction)
-        tree.setHeaderLabels(header_labels)
         tree.setAlternatingRowColors(True)
         # tree.setDragEnabled(True)
         # tree.setAcceptDrops(True)
         # tree.setDropIndicatorShown(True)
 
-    class ClassificationColorDelegate(QStyledItemDelegate):
-        hsv_classification_colors = {
-            classification: QColor.fromHsv(
-                360 * i // len(classification_classes), 20, 255
-            )
-            for i, classification in enumerate(classification_classes)
-        }
-
-        def paint(
-            self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex
-        ):
-            super().paint(painter, option, index)
-            if index.column() == 1:
-                classification = index.data()
-                color = self.hsv_classification_colors.get(
-                    classification, QColor(255, 255, 255)
-                )
-                color = color if index.row() % 2 else color.lighter(103)
-                painter.fillRect(option.rect, QBrush(color))
-                painter.drawText(
-                    option.rect, Qt.AlignmentFlag.AlignLeft, classification
-                )
-                # BUG : I am not rendering the selection color, so the selected items are not colored, but oh well, it works for now
-
     def gen_top2(self):
         """Generate the dataset selection dock that uses a list widget and buttons"""
         # Setup the layout
@@ -447,8 +995,8 @@ class ModelTrainerApp(QMainWindow):
         self.top2_base_layout.addWidget(self.top2_files_tabs)
 
         # Add the 2 Trees
-        self.top2_list_audio = QTreeWidget()
-        self.top2_list_mel = QTreeWidget()
+        self.top2_list_audio = QTreeView()
+        self.top2_list_mel = QTreeView()
         self.top2_files_tabs.addTab(self.top2_list_audio, "Audio Files")
         self.top2_files_tabs.addTab(self.top2_list_mel, "MEL Files")
 
@@ -489,17 +1037,9 @@ class ModelTrainerApp(QMainWindow):
         self.file_tree_configure(
             self.top2_list_mel, ["MEL Files", "Classification", "Path"]
         )
-        self.top2_list_audio.setItemDelegateForColumn(
-            1, self.ClassificationColorDelegate()
-        )
-        self.top2_list_mel.setItemDelegateForColumn(
-            1, self.ClassificationColorDelegate()
-        )
 
         # Add demo items
-        for i in range(10):
-            item = QTreeWidgetItem([f"Audio File {i}", "Unknown", f"Path {i}"])
-            self.top2_list_audio.addTopLevelItem(item)
+        self.top2_list_audio.model().add_files([f"Path {i}" for i in range(10)])
 
         # Add the connections
         def select_audio_files():
@@ -507,44 +1047,33 @@ class ModelTrainerApp(QMainWindow):
                 self, "Select Audio Files", "", "Audio Files (*.wav *.mp3)"
             )
             if files:
-                if not self.top2_append.isChecked():
-                    self.top2_list_audio.clear()
-                for file in files:
-                    file_name = os.path.basename(file)
-                    item = QTreeWidgetItem([file_name, "Unknown", file])
-                    self.top2_list_audio.setToolTip(0, file_name)
-                    self.top2_list_audio.setToolTip(2, file)
-                    self.top2_list_audio.addTopLevelItem(item)
+                self.top2_list_audio.model().add_files(
+                    files, self.top2_append.isChecked()
+                )
 
         def select_mel_files():
             files, _ = QFileDialog.getOpenFileNames(
                 self, "Select MEL Files", "", "MEL Files (*.npy)"
             )
             if files:
-                if not self.top2_append.isChecked():
-                    self.top2_list_mel.clear()
-                for file in files:
-                    file_name = os.path.basename(file)
-                    item = QTreeWidgetItem([file_name, "Unknown", file])
-                    self.top2_list_audio.setToolTip(0, file_name)
-                    self.top2_list_audio.setToolTip(2, file)
-                    self.top2_list_mel.addTopLevelItem(item)
+                self.top2_list_mel.model().add_files(
+                    files, self.top2_append.isChecked()
+                )
 
         self.top2_select_audio.clicked.connect(select_audio_files)
         self.top2_select_mel.clicked.connect(select_mel_files)
 
         def apply_classification():
             selected_class = self.top2_class_assign.currentText()
-            for item in self.top2_list_audio.selectedItems():
-                item.setText(1, selected_class)
-            for item in self.top2_list_mel.selectedItems():
-                item.setText(1, selected_class)
+            for tree in (self.top2_list_audio, self.top2_list_mel):
+                rows = [index.row() for index in tree.selectionModel().selectedRows()]
+                tree.model().set_classification(rows, selected_class)
 
         self.top2_class_apply.clicked.connect(apply_classification)
 
         def clear_files():
-            self.top2_list_audio.clear()
-            self.top2_list_mel.clear()
+            self.top2_list_audio.model().clear()
+            self.top2_list_mel.model().clear()
 
         self.top2_clear.clicked.connect(clear_files)
 
@@ -563,7 +1092,9 @@ class ModelTrainerApp(QMainWindow):
         # Training options must have a button to start training
         self.launch_training_button = QPushButton("Launch Training Tasks")
         self.top3_base_layout.addWidget(self.launch_training_button)
-        self.launch_training_button.clicked.connect(self.train_models)
+        # Through a lambda: the profiling wrappers of train_models (see sampled) accept any
+        # arguments, so PyQt would pass them clicked's checked flag
+        self.launch_training_button.clicked.connect(lambda: self.train_models())
 
         # Training options subwidget
         self.training_options_subwidget1 = QGroupBox("Dataset Basic Settings")
@@ -604,6 +1135,14 @@ class ModelTrainerApp(QMainWindow):
         self.random_state_param.setValue(42)
         make_param("Random State:", self.random_state_param, 4, 0)
 
+        self.cv_folds_param = QSpinBox()
+        self.cv_folds_param.setRange(0, 20)
+        self.cv_folds_param.setValue(0)
+        self.cv_folds_param.setToolTip(
+            "Cross-validation folds on the training set (0: off)"
+        )
+        make_param("CV Folds:", self.cv_folds_param, 5, 0)
+
         # Audio to MEL Processing Parameters
         self.audio_processing_subwidget = QGroupBox(
             "Audio Processing Parameters (To MEL)"
@@ -612,6 +1151,15 @@ class ModelTrainerApp(QMainWindow):
         self.audio_processing_subwidget.setLayout(self.audio_processing_grid)
         self.top3_base_layout.addWidget(self.audio_processing_subwidget)
 
+        self.cache_features_param = QCheckBox("Cache MEL Spectrograms")
+        self.cache_features_param.setChecked(True)
+        self.audio_processing_grid.addWidget(self.cache_features_param, 0, 0)
+        self.cache_regenerate_param = QCheckBox("Regenerate Cache")
+        self.cache_regenerate_param.setToolTip(
+            "Clear the cached MEL spectrograms before the next training"
+        )
+        self.audio_processing_grid.addWidget(self.cache_regenerate_param, 0, 1)
+
         # TODO : Add the audio processing parameters here
 
         # MEL Processing Parameters
@@ -647,7 +1195,7 @@ class ModelTrainerApp(QMainWindow):
             self.model_parameter_grid.itemAt(i).widget().deleteLater()
         for tree_item in self.top1_tree.selectedItems():
             model_name = tree_item.text(0)
-            model_params = self.model_parameter_entries.get(model_name, "")
+            model_params = self.model_parameter_entries.setdefault(model_name, {})
             group = QGroupBox(model_name)
             layout = QVBoxLayout()
             group.setLayout(layout)
@@ -659,11 +1207,18 @@ class ModelTrainerApp(QMainWindow):
             )
             layout.addWidget(text_edit)
             self.model_parameter_grid.addWidget(group)
-            text_edit.textChanged.connect(
-                lambda: self.model_parameter_entries[model_name].update(
-                    self.parse_model_parameters(text_edit.toPlainText())
-                )
+            # Only parse the parameters once the user stops typing
+            parse_timer = QTimer(text_edit, singleShot=True, interval=250)
+            parse_timer.timeout.connect(
+                partial(self.apply_model_parameters, model_name, text_edit)
             )
+            text_edit.textChanged.connect(parse_timer.start)
+
+    def apply_model_parameters(self, model_name: str, text_edit: QTextEdit):
+        """Store the parameters of a model entry, if its text is a valid dictionary"""
+        model_params = self.parse_model_parameters(text_edit.toPlainText())
+        if model_params is not None:
+            self.model_parameter_entries[model_name] = model_params
 
     def gen_bottom(self):
         """Generate the training tasks dock that uses a list widget and buttons"""
@@ -682,9 +1237,13 @@ class ModelTrainerApp(QMainWindow):
         self.bottom_tasks.setAlternatingRowColors(True)
 
         # Add demo items
-        for i in range(10):
-            item = QTreeWidgetItem([f"Task {i}", "0%", "Params", "Files"])
-            self.bottom_tasks.addTopLevelItem(item)
+        self.add_tree_items(
+            self.bottom_tasks,
+            [
+                QTreeWidgetItem([f"Task {i}", "0%", "Params", "Files"])
+                for i in range(10)
+            ],
+        )
 
         # Add the tools
         self.bottom_stop_all = QPushButton("Stop All Tasks")
@@ -703,6 +1262,7 @@ class ModelTrainerApp(QMainWindow):
 
         self.bottom_tools_layout.addStretch()
 
+    @sampled
     def train_models(self):
         """Train the selected models using the selected dataset"""
         # Get the selected models
@@ -710,115 +1270,163 @@ class ModelTrainerApp(QMainWindow):
         for tree_item in self.top1_tree.selectedItems():
             selected_models.append(tree_item.text(0))
 
+        # Only load the datasets that are used, and only the (audio, MEL) pairs when fusing them
+        fuse_datasets = self.test_split_mode.currentText()  # FUSE, ONLY AUDIO, ONLY MEL
+        audio_files, mel_files = [], []
+        if "ONLY MEL" not in fuse_datasets:
+            audio_files = self.top2_list_audio.model().snapshot()
+        if "ONLY AUDIO" not in fuse_datasets:
+            mel_files = self.top2_list_mel.model().snapshot()
+        if "FUSE" in fuse_datasets:
+            n_pairs = min(len(audio_files), len(mel_files))
+            audio_files, mel_files = audio_files[:n_pairs], mel_files[:n_pairs]
+
         # Transform the audio datasets into MEL datasets
-        audio_mel_datasets = [
-            (self.process_audio(tree_item.text(2)), tree_item.text(1))
-            for tree_item in self.top2_list_audio.topLevelItems()
-        ]
-        mel_datasets = [
-            (self.load_mel(tree_item.text(2)), tree_item.text(1))
-            for tree_item in self.top2_list_mel.topLevelItems()
+        # (librosa is CPU bound, so use processes, while loading .npy files is I/O bound)
+        audio_paths = [path for path, _ in audio_files]
+        audio_labels = [label for _, label in audio_files]
+        mel_paths = [path for path, _ in mel_files]
+        mel_labels = [label for _, label in mel_files]
+        if self.cache_regenerate_param.isChecked():
+            shutil.rmtree(mel_cache_dir, ignore_errors=True)
+            self.cache_regenerate_param.setChecked(False)
+        use_cache = self.cache_features_param.isChecked()
+        # Both pools run at the same time, the MEL files load while the audio is processed.
+        # The audio is sent in batches, a few per worker to balance the load
+        batch_size = max(1, len(audio_paths) // (4 * (os.cpu_count() or 1)))
+        audio_batches = [
+            audio_paths[i : i + batch_size]
+            for i in range(0, len(audio_paths), batch_size)
         ]
+        mel_executor = ThreadPoolExecutor()
+        with ProcessPoolExecutor() as audio_executor, mel_executor:
+            audio_mels = audio_executor.map(
+                partial(process_audio_batch, use_cache=use_cache), audio_batches
+            )
+            mels = load_mels(mel_paths, mel_executor)
+            audio_mels = list(chain.from_iterable(audio_mels))
         mel_vec_size = self.mel_size_param.value()  # 20
         mel_vec_len = self.mel_len_param.value()  # 20
 
-        # Optionaly fuse the 2 datasets
-        fuse_datasets = self.test_split_mode.currentText()  # FUSE, ONLY AUDIO, ONLY MEL
+        # Optionaly fuse the 2 datasets: the features of each (audio, MEL) pair are written side
+        # by side in a preallocated training matrix, labeled by the audio file
         if "FUSE" in fuse_datasets:
-            # Fuse the datasets
-            fused_datasets = [
-                (np.concatenate([audio_data[0], mel_data[0]]), audio_data[1])
-                for audio_data, mel_data in zip(audio_mel_datasets, mel_datasets)
-            ]
+            sources, labels = [audio_mels, mels], audio_labels
         elif "ONLY AUDIO" in fuse_datasets:
-            fused_datasets = audio_mel_datasets
+            sources, labels = [audio_mels], audio_labels
         elif "ONLY MEL" in fuse_datasets:
-            fused_datasets = mel_datasets
+            sources, labels = [mels], mel_labels
+        n_samples = min(len(source) for source in sources)
+        feature_len = mel_vec_size * mel_vec_len
+        X = np.empty((n_samples, len(sources) * feature_len), dtype=np.float32)
+        y = np.fromiter(
+            (classification_ids[label] for label in labels[:n_samples]),
+            dtype=np.int16,
+            count=n_samples,
+        )
 
-        # Transform the datasets a bit more (if needed)
-        fuse_datasets = [
-            (self.process_mel(mel_data, mel_vec_size, mel_vec_len), label)
-            for mel_data, label in fused_datasets
-        ]
+        # Transform the datasets a bit more (if needed), straight into their row of X
+        for i in range(n_samples):
+            for j, source in enumerate(sources):
+                feature = X[i, j * feature_len : (j + 1) * feature_len]
+                self.process_mel(
+                    source[i],
+                    mel_vec_size,
+                    mel_vec_len,
+                    out=feature.reshape(mel_vec_size, mel_vec_len),
+                )
 
-        # Split the dataset into training and testing
+        # Split the dataset into training and testing, once for all the models
+        # (stratified when every class has enough samples to be in both sets)
         test_size = self.test_size_param.value()  # 0.2
         random_state = self.random_state_param.value()  # 42
-        X, y = zip(*fused_datasets)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state
+        stratify = (
+            y if len(y) and np.unique(y, return_counts=True)[1].min() >= 2 else None
         )
+        train_indices, test_indices = split_indices(
+            len(y), test_size, random_state, stratify
+        )
+        X_train, X_test = X[train_indices], X[test_indices]
+        y_train, y_test = y[train_indices], y[test_indices]
 
         # Train the models
-        for model_name in selected_models:
-            self.launch_task(model_name, X_train, X_test, y_train, y_test)
-
-    def launch_task(self, model_name, X_train, X_test, y_train, y_test):
-        """Launch a training task for a model"""
-        # Create a task thread
-        task_thread = QThread()
-        with task_thread:
+        cv_folds = self.cv_folds_param.value()  # 0 (off)
+        self.launch_task(selected_models, X_train, X_test, y_train, y_test, cv_folds)
+
+    def launch_task(self, model_names, X_train, X_test, y_train, y_test, cv_folds=0):
+        """Launch a training task for the models, in a worker thread"""
+        models = []
+        task_items = {}
+        for model_name in model_names:
             model_to_use = self.search_model_by_name(model_name)
             if model_to_use is None:
-                print(f"Model {model_name} not found")
-                return
-            model_instance = model_to_use()
-            model_instance.fit(X_train, y_train)
-            y_pred = model_instance.predict(X_test)
-            accuracy = model_instance.score(X_test, y_test)
-            print(f"Model {model_name} trained with accuracy {accuracy}")
+                logger.error("Model %s not found", model_name)
+                continue
+            models.append((model_name, model_to_use))
+            task_items[model_name] = QTreeWidgetItem(
+                [model_name, "0%", "", f"{len(X_train)} train / {len(X_test)} test"]
+            )
+        self.add_tree_items(self.bottom_tasks, list(task_items.values()))
+
+        def model_trained(model_name: str, accuracy: float, cv_accuracy: float):
+            progress = f"100% (accuracy {accuracy:.3f}"
+            if not np.isnan(cv_accuracy):
+                progress += f", CV {cv_accuracy:.3f}"
+            task_items[model_name].setText(1, progress + ")")
+            logger.info("Model %s trained with accuracy %s", model_name, accuracy)
+
+        def model_failed(model_name: str, error: str):
+            task_items[model_name].setText(1, f"Failed ({error})")
+            logger.error("Model %s failed: %s", model_name, error)
+
+        worker = TrainingWorker(
+            models, X_train, X_test, y_train, y_test, cv_folds, self
+        )
+        worker.model_trained.connect(model_trained)
+        worker.model_failed.connect(model_failed)
+        worker.finished.connect(lambda: self.training_workers.remove(worker))
+        self.training_workers.append(worker)
+        worker.start()
+
+    def closeEvent(self, event):
+        """Wait for the running training workers, a QThread must not be destroyed while running"""
+        for worker in list(self.training_workers):
+            worker.wait()
+        super().closeEvent(event)
 
     def search_model_by_name(self, model_name):
         """Search for a model by its name"""
-        for model_type, model_dict in models_dict.items():
-            for model_name_, (model_class, model_description) in model_dict.items():
-                if model_name == model_name_:
-                    return model_class
-        return None
+        if model_name not in model_classes_by_name:
+            return None
+        return resolve_model_class(*model_classes_by_name[model_name])
 
-    def parse_model_parameters(self, text_dict_param: str) -> Dict:
+    def parse_model_parameters(self, text_dict_param: str) -> Optional[Dict]:
         """
-        Parse the model parameters from a text dictionary, it accepts the following format:
+        Parse the model parameters from a text dictionary (Python literals only), it accepts the following format:
         {
             "param1": "value1",
             "param2": 123,
             "param3": True,
             "param4": None
         }
+        The braces can be omitted, the lines are then joined into a dictionary.
+        Returns None if the text is not a valid dictionary (yet)
         """
-        dict_param = {}
-        for line in text_dict_param.split("\n"):
-            if line:
-                key, value = line.split(":")
-                key = key.strip()
-                value = value.strip()
-                if value.isnumeric():
-                    value = int(value)
-                elif value.lower() == "true":
-                    value = True
-                elif value.lower() == "false":
-                    value = False
-                elif value.lower() == "none":
-                    value = None
-                dict_param[key] = value
-        return dict_param
-
-    def process_audio(self, audio_file):
-        """Process an audio file into a MEL spectrogram"""
-        audio_data = librosa.load(audio_file)
-        mel_data = librosa.feature.melspectrogram(audio_data[0], sr=audio_data[1])
-        # TODO: Add signal processing here
-        return mel_data
-
-    def load_mel(self, mel_file):
-        """Load a MEL spectrogram from a file"""
-        mel_data = np.load(mel_file)
-        return mel_data
-
-    def process_mel(self, mel_data, mel_vec_size, mel_vec_len):
-        """Process a MEL spectrogram into a fixed-size vector"""
-        # TODO: Add MELVEC processing here
-        return mel_data
+        text_dict_param = text_dict_param.strip()
+        if not text_dict_param.startswith("{"):
+            lines = (line.strip().rstrip(",") for line in text_dict_param.split("\n"))
+            text_dict_param = "{" + ",".join(line for line in lines if line) + "}"
+        try:
+            dict_param = ast.literal_eval(text_dict_param)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return None
+        return dict_param if isinstance(dict_param, dict) else None
+
+    def process_mel(self, mel_data, mel_vec_size, mel_vec_len, out=None):
+        """Process a MEL spectrogram into a fixed-size vector (written to out, if given)"""
+        if out is None:
+            out = np.empty((mel_vec_size, mel_vec_len), dtype=np.float32)
+        return feature_extractor(mel_vec_size, mel_vec_len)(mel_data, out)
 
 
 ####################################################################################################
@@ -826,6 +1434,12 @@ class ModelTrainerApp(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    # Style the docks (border, title bar), once for the whole application
+    app.setStyleSheet("QDockWidget { border: 1px solid #a0a0a0; }")
+    # The training results (and the profile timings) are reported at the INFO level
+    logging.basicConfig(level=logging.INFO)
+    if PROFILE:
+        app.aboutToQuit.connect(print_profile_timings)
     window = ModelTrainerApp()
     window.show()
     sys.exit(app.exec())
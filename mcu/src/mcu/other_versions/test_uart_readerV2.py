@@ -0,0 +1,71 @@
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from uart_readerV2 import GUI_MainWindow
+
+
+@pytest.fixture
+def window() -> SimpleNamespace:
+    # Only the mel history state of the main window, without building its UI
+    window = SimpleNamespace(
+        settings=SimpleNamespace(
+            mel_history_max_mem=10, mel_vector_num=2, mel_vector_size=3
+        ),
+        logger=logging.getLogger("test_uart_readerV2"),
+        _mel_ring=np.zeros((0, 0, 0), dtype=np.uint16),
+    )
+    for name in ["_handle_mel", "clear_mel_history", "mel_history"]:
+        setattr(window, name, getattr(GUI_MainWindow, name).__get__(window))
+    return window
+
+
+def receive(window: SimpleNamespace, n: int) -> None:
+    for i in range(n):
+        window._handle_mel(np.full(6, i, dtype=np.uint16))
+
+
+def test_handle_mel(window: SimpleNamespace):
+    receive(window, 1)
+
+    assert window._mel_ring.shape == (10, 2, 3)
+    assert (window.mel_frame == 0).all()
+
+    # Extra words are dropped, short frames are ignored
+    window._handle_mel(np.arange(8, dtype=np.uint16))
+    window._handle_mel(np.arange(5, dtype=np.uint16))
+
+    assert window._mel_count == 2
+    assert window.mel_frame.tolist() == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_mel_history(window: SimpleNamespace):
+    receive(window, 3)
+
+    assert window.mel_history()[:, 0, 0].tolist() == [0, 1, 2]
+    assert window.mel_history(2)[:, 0, 0].tolist() == [1, 2]
+    assert window.mel_history(12)[:, 0, 0].tolist() == [0, 1, 2]
+
+
+def test_mel_history_wrapped(window: SimpleNamespace):
+    receive(window, 13)
+
+    assert window.mel_history()[:, 0, 0].tolist() == list(range(3, 13))
+    assert window.mel_history(4)[:, 0, 0].tolist() == [9, 10, 11, 12]
+    assert window.mel_history(12)[:, 0, 0].tolist() == list(range(3, 13))
+
+
+def test_clear_mel_history(window: SimpleNamespace):
+    receive(window, 3)
+    window.clear_mel_history()
+
+    assert len(window.mel_history()) == 0
+    assert (window.mel_frame == 0).all()
+
+    # A new shape in the settings resizes the history
+    window.settings.mel_history_max_mem = 4
+    receive(window, 5)
+
+    assert window._mel_ring.shape == (4, 2, 3)
+    assert window.mel_history()[:, 0, 0].tolist() == [1, 2, 3, 4]
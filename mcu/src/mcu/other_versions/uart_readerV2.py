@@ -3,28 +3,32 @@ UART reader utilities, developed by the group E, 2024-2025.
 """
 
 # Standard Library
-import datetime
 import logging
+import logging.handlers
+import os
 import pathlib as pathl
+import pickle
+import queue
 import sys
 import time
-from queue import Queue
+from collections import deque
+from functools import partial
 from shutil import rmtree
 from threading import Lock
 from typing import Optional
 
 # Installed Libraries
-import matplotlib
-import matplotlib.pyplot as plt
+import matplotlib.style
 import numpy as np
-from matplotlib.animation import FuncAnimation
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QPalette, QTextCursor
 from PyQt6.QtWidgets import (
     QApplication,
     QCheckBox,
     QComboBox,
+    QDoubleSpinBox,
     QFileDialog,
     QGridLayout,
     QGroupBox,
@@ -41,9 +45,15 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
+from scipy.fft import rfft
 from serial import Serial, SerialException
 from serial.tools import list_ports
 
+try:  # Compiled kernels, when installed (pip install numba)
+    import numba
+except ImportError:  # NumPy versions of the kernels are used instead
+    numba = None
+
 # Local
 # from mcu.src.mcu import user_classifier
 
@@ -52,6 +62,40 @@ from serial.tools import list_ports
 # Settings
 
 
+def _update_choice(current, value):
+    """Update an APP_Settings.ChoiceBox from an index, a list of choices, or both"""
+    if type(value) == int:
+        if current.index == value:
+            return False
+        current.index = value
+    elif type(value) == list:
+        if current.choices == value:
+            return False
+        current.choices = value
+    else:
+        index, choices = value
+        if current.index == index and current.choices == choices:
+            return False
+        current.index, current.choices = index, choices
+    return True
+
+
+def _update_path(current, value):
+    """Update an APP_Settings.PathBox from a path"""
+    if current.path == value:
+        return False
+    current.path = value
+    return True
+
+
+def _update_dimension(current, value):
+    """Update an APP_Settings.DimensionElement from a list"""
+    if current.list == value:
+        return False
+    current.list = value
+    return True
+
+
 class APP_Settings:
     """
     Class to store the settings of the application.
@@ -60,6 +104,8 @@ class APP_Settings:
     """
 
     class ChoiceBox:
+        __slots__ = ("__default", "choices", "index")
+
         def __init__(self, default, choices):
             self.__default = default
             self.index = default
@@ -72,6 +118,8 @@ class APP_Settings:
             return self.choices[self.index]
 
     class PathBox:
+        __slots__ = ("default", "is_folder", "path")
+
         def __init__(self, default, is_folder=False):
             self.default = default
             self.path = default
@@ -84,6 +132,8 @@ class APP_Settings:
             return self.path
 
     class DimensionElement:
+        __slots__ = ("editable", "list")
+
         def __init__(self, tuple, editable=False):
             self.list = list(tuple)
             self.editable = editable
@@ -181,6 +231,13 @@ class APP_Settings:
         self.classifier_use_mel_history = False  # Requires the use of the .npy with a dictionary and "history_len" key
         self.classifier_history_max_shown = 10  # Max shown
 
+        # Updaters of the public settings, resolved once
+        self.__updaters = {
+            key: self.__make_updater(key)
+            for key in list(self.__dict__)
+            if not key.startswith("_")
+        }
+
     def register_callback(self, name: str, callback: callable):
         """
         Register a callback function to be called when settings are updated.
@@ -199,29 +256,32 @@ class APP_Settings:
             for name, callback in self.__setting_callbacks.items():
                 callback(self)
 
-    def __update_value(self, key, value):
+    def _update_attribute(self, key, value):
+        """Update a plain value, replacing it"""
+        old = getattr(self, key)
+        if type(old) == type(value) and old == value:
+            return False
+        setattr(self, key, value)
+        return True
+
+    # Updater of each boxed setting type, the other values are replaced
+    _BOX_UPDATERS = {
+        ChoiceBox: _update_choice,
+        PathBox: _update_path,
+        DimensionElement: _update_dimension,
+    }
+
+    def __make_updater(self, key):
         """
-        Update a single value.
+        Build the function updating a single value, depending on its type.
+
+        The function returns whether the value changed.
         """
-        with self.__lock_protection:
-            # Check if the key exists
-            if hasattr(self, key):
-                # Update the value depending on the type
-                if isinstance(getattr(self, key), APP_Settings.ChoiceBox):
-                    if type(value) == int:
-                        getattr(self, key).index = value
-                    elif type(value) == list:
-                        getattr(self, key).choices = value
-                    else:
-                        index, choices = value
-                        getattr(self, key).index = index
-                        getattr(self, key).choices = choices
-                elif isinstance(getattr(self, key), APP_Settings.PathBox):
-                    getattr(self, key).path = value
-                elif isinstance(getattr(self, key), APP_Settings.DimensionElement):
-                    getattr(self, key).list = value
-                else:
-                    setattr(self, key, value)
+        current = getattr(self, key)
+        update = self._BOX_UPDATERS.get(type(current))
+        if update is None:
+            return partial(self._update_attribute, key)
+        return partial(update, current)
 
     def update_values(self, new_settings: dict):
         """Update settings with update lock to prevent circular updates"""
@@ -230,29 +290,33 @@ class APP_Settings:
 
         self.__updating = True
         try:
-            for key, value in new_settings.items():
-                if hasattr(self, key):
-                    self.__update_value(key, value)
-            self.__call_callbacks()
+            changed = False
+            with self.__lock_protection:
+                for key, value in new_settings.items():
+                    update = self.__updaters.get(key)
+                    if update is not None and update(value):
+                        changed = True
+            if changed:
+                self.__call_callbacks()
         finally:
             self.__updating = False
 
     def import_settings(self, filename):
         """
-        Import the settings (dictionary) from a .cfg.npy file.
+        Import the settings (dictionary) from a .cfg.pkl file.
         """
-        with self.__lock_protection:
-            try:
-                new_settings = np.load(filename, allow_pickle=True).item()
-                self.update_values(new_settings)
-                return True
-            except Exception as e:
-                print(f"Failed to import settings: {e}")
-                return False
+        try:
+            with open(filename, "rb") as f:
+                new_settings = pickle.load(f)
+            self.update_values(new_settings)
+            return True
+        except Exception as e:
+            print(f"Failed to import settings: {e}")
+            return False
 
     def export_settings(self, filename):
         """
-        Export the settings to a .cfg.npy file.
+        Export the settings to a .cfg.pkl file.
         """
         with self.__lock_protection:
             try:
@@ -264,9 +328,17 @@ class APP_Settings:
                         or key.startswith("app_")
                     ):
                         continue
+                    # Store the values the way update_values takes them
+                    if isinstance(value, APP_Settings.ChoiceBox):
+                        value = (value.index, value.choices)
+                    elif isinstance(value, APP_Settings.PathBox):
+                        value = value.path
+                    elif isinstance(value, APP_Settings.DimensionElement):
+                        value = value.list
                     new_dict[key] = value
 
-                np.save(filename, self.__dict__)
+                with open(filename, "wb") as f:
+                    pickle.dump(new_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
                 return True
             except Exception as e:
                 print(f"Failed to export settings: {e}")
@@ -303,13 +375,22 @@ def setup_logging(settings):
     # Create the console handler (CLI)
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # Create the file handler
     if settings.logging_use_file:
         file_handler = logging.FileHandler(settings.logging_file.path)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # The console and file are written by a background thread, so that the
+    # GUI and serial threads never wait on them
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.listener = logging.handlers.QueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    queue_handler.listener.start()
+    logger.addHandler(queue_handler)
 
     # Return the logger
     return logger
@@ -318,12 +399,25 @@ def setup_logging(settings):
 class QTextEditLogger(logging.Handler):
     """
     Custom logging handler that writes to a QTextEdit widget on the GUI.
+
+    The records can come from any thread, the lines are queued and added to
+    the widget in batches by a timer of the GUI thread.
     """
 
+    MAX_LINES = 500
+
     def __init__(self, text_edit: QTextEdit, settings: APP_Settings):
         super().__init__()
         self.text_edit = text_edit
+        self.text_edit.document().setMaximumBlockCount(self.MAX_LINES)
         self.app_settings = settings
+        self._templates = {}
+        self._timestamp = (None, "")
+        self._lines = deque(maxlen=self.MAX_LINES)  # Drop the oldest
+        self._flush_timer = QTimer(text_edit)
+        self._flush_timer.setInterval(33)
+        self._flush_timer.timeout.connect(self._flush_lines)
+        self._flush_timer.start()
 
     STYLES = {
         logging.INFO: "color: black",
@@ -343,20 +437,59 @@ class QTextEditLogger(logging.Handler):
         logging.CRITICAL: True,
     }
 
+    def _template(self, record: logging.LogRecord) -> str:
+        """Line template of the record level, taking the date and message"""
+        template = self._templates.get(record.levelno)
+        if template is None:
+            level = (
+                f" {record.levelname} "
+                if self.HAS_RECORD_NAME.get(record.levelno, True)
+                else " "
+            )
+            template = (
+                f"<span style='{self.STYLES.get(record.levelno, '')}; white-space: pre'>"
+                f"[%s] {level}>> %s</span>"
+            )
+            self._templates[record.levelno] = template
+        return template
+
+    def _format_date(self, created: float) -> str:
+        """Date of the record, formatted once per second"""
+        second = int(created)
+        if self._timestamp[0] != second:
+            date = time.strftime(
+                self.app_settings.logging_date_format, time.localtime(second)
+            )
+            self._timestamp = (second, date)
+        return self._timestamp[1]
+
     def emit(self, record: logging.LogRecord):
-        msg = record.getMessage()
-        line = (
-            f"<span style='{self.STYLES.get(record.levelno, '')}; white-space: pre'>",
-            f"[{datetime.datetime.fromtimestamp(record.created).strftime(self.app_settings.logging_date_format)}] ",  # Date
-            f" {record.levelname} "
-            if self.HAS_RECORD_NAME.get(record.levelno, True)
-            else " ",  # Level
-            f">> {msg}",
-            "</span>",
+        line = self._template(record) % (
+            self._format_date(record.created),
+            record.getMessage(),
         )
-        # Append to the text edit if its smaller than 500 lines
-        if self.text_edit.document().blockCount() < 500:
-            self.text_edit.append("".join(line))
+        self._lines.append(line)
+
+    def _flush_lines(self):
+        """Add the queued lines to the widget in a single edit"""
+        if not self._lines:
+            return
+        scrollbar = self.text_edit.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        new_block = not self.text_edit.document().isEmpty()
+        while self._lines:
+            if new_block:
+                cursor.insertBlock()
+            cursor.insertHtml(self._lines.popleft())
+            new_block = True
+        cursor.endEditBlock()
+
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
 
 def test_logging(logger: logging.Logger):
@@ -373,15 +506,34 @@ def test_logging(logger: logging.Logger):
 # Serial
 
 
+# Last listed ports and the listing time, as comports() can take 100+ ms
+_ports_cache = (float("-inf"), [])
+
+
+def _list_ports(max_age: float = 0.5) -> list:
+    """Names of the serial ports, listed again after max_age seconds"""
+    global _ports_cache
+    now = time.monotonic()
+    if now - _ports_cache[0] > max_age:
+        ports = [
+            f"{port.device} - {port.description}" for port in list_ports.comports()
+        ]
+        _ports_cache = (now, ports)
+    return _ports_cache[1]
+
+
 def get_available_ports(app_settings: APP_Settings):
     """Get available serial ports without triggering circular updates"""
     old_index = app_settings.serial_port.index
     old_port = app_settings.serial_port.choices[old_index]
 
     # Get new ports
-    new_ports = ["-- No serial port --"] + [
-        f"{port.device} - {port.description}" for port in list_ports.comports()
-    ]
+    new_ports = ["-- No serial port --"] + _list_ports()
+
+    # Nothing to do if the same ports are still there
+    if frozenset(new_ports) == frozenset(app_settings.serial_port.choices):
+        return
+    port_index = {port: i for i, port in enumerate(new_ports)}
 
     # Update settings if changed
     if len(new_ports) == 1:
@@ -389,11 +541,11 @@ def get_available_ports(app_settings: APP_Settings):
     else:
         # Try to keep the same port if possible
         # If not, select the one depending on the auto select index
-        if old_port in new_ports and old_index != 0:
-            new_index = new_ports.index(old_port)
-        elif old_index == 0:
+        if old_index != 0 and old_port in port_index:
+            new_index = port_index[old_port]
+        else:
             new_index = app_settings.serial_auto_select_index
-            if new_index > len(new_ports):
+            if new_index >= len(new_ports):
                 new_index = 1
     app_settings.update_values({"serial_port": (new_index, new_ports)})
 
@@ -403,12 +555,15 @@ class SerialReader(QThread):
     Thread-safe serial port reader with queued writing capability.
 
     Signals:
-        data_received (str): Emitted when data is received from serial port
+        data_received (list): Emitted with the items received from serial port,
+            batched at most gui_update_rate times per second. Text lines are
+            str, audio and mel payloads are (prefix, uint16 ndarray) tuples.
+            "CONNECTION_TERMINATED" (str) is emitted alone when the link drops
         connection_state (bool): Emitted when connection state changes
         error_occurred (str): Emitted when an error occurs
     """
 
-    data_received = pyqtSignal(str)
+    data_received = pyqtSignal(object)
     connection_state = pyqtSignal(bool)
     error_occurred = pyqtSignal(str)
 
@@ -418,10 +573,14 @@ class SerialReader(QThread):
         self.logger = logger
         self._serial: Optional[Serial] = None
         self._running = False
-        self._write_queue = Queue()
+        self._write_queue: deque[bytes] = deque()
         self._lock = Lock()
         self._buffer_size = 1024 * 8
         self._thread_id = None
+        self._pending: list = []
+        self._last_flush = time.monotonic()
+        self._decode_errors = 0
+        self._last_decode_report = 0.0
 
     @property
     def is_connected(self) -> bool:
@@ -480,6 +639,16 @@ class SerialReader(QThread):
                     write_timeout=1.0,
                 )
 
+                # Ask the driver to pass bytes on without coalescing them, and
+                # for larger OS buffers where supported (Linux and Windows)
+                try:
+                    if sys.platform == "win32":
+                        self._serial.set_buffer_size(rx_size=65536, tx_size=65536)
+                    else:
+                        self._serial.set_low_latency_mode(True)
+                except (AttributeError, OSError, ValueError) as e:
+                    self.logger.debug(f"Low latency mode unavailable: {e}")
+
             self.logger.good(f"Connected to {self.settings.serial_port}")
             self.connection_state.emit(True)
 
@@ -501,6 +670,7 @@ class SerialReader(QThread):
 
     def _read_loop(self) -> None:
         """Main reading loop with connection monitoring"""
+        line_buffer = bytearray()
         while self._running:
             try:
                 # Check connection status
@@ -509,39 +679,115 @@ class SerialReader(QThread):
                     break
 
                 # Process write queue
-                if not self._write_queue.empty() and self.settings.serial_allow_write:
+                if self._write_queue and self.settings.serial_allow_write:
                     self._process_write_queue()
 
-                # Read available data with timeout
+                # Nothing more waiting: hold the pending lines until the end
+                # of the frame rather than blocking on the next byte
+                period = 1.0 / self.settings.gui_update_rate
+                try:
+                    waiting = self._serial.in_waiting
+                except (SerialException, OSError, AttributeError):
+                    waiting = 0  # Reported by the read below
+                if self._pending and not waiting:
+                    remaining = self._last_flush + period - time.monotonic()
+                    if remaining > 0:
+                        self.msleep(int(remaining * 1000) + 1)
+                    self._flush_pending()
+                    continue
+
+                # Drain everything already waiting in a single read, straight
+                # from the file descriptor on POSIX, or block until the next
+                # byte arrives (or the timeout expires)
                 try:
-                    if self._serial.in_waiting > 0 and not self.settings.serial_freeze:
-                        data = self._serial.readline(self._buffer_size)
-                        if data:
-                            decoded = data.decode("ascii").strip()
-                            self.data_received.emit(decoded)
-                except (SerialException, OSError) as e:
+                    fd = getattr(self._serial, "fd", None)
+                    if waiting and fd is not None:
+                        data = os.read(fd, waiting)
+                    else:
+                        data = self._serial.read(waiting or 1)
+                except (SerialException, OSError, TypeError, AttributeError) as e:
+                    if not self._running:
+                        break  # Port closed by stop()
                     self._handle_error(f"Serial port error: {e}")
                     break
-                except UnicodeDecodeError as e:
-                    self.logger.warning(f"Decode error: {e}")
+
+                if not data:
+                    continue
+                if self.settings.serial_freeze:
+                    line_buffer.clear()
                     continue
 
-                # Small sleep to prevent CPU hogging
-                time.sleep(0.001)
+                # Split the complete lines, keep the partial one for later
+                line_buffer += data
+                if b"\n" in data:
+                    lines = line_buffer.split(b"\n")
+                    line_buffer = lines.pop()
+                elif len(line_buffer) >= self._buffer_size:
+                    lines = [line_buffer]
+                    line_buffer = bytearray()
+                else:
+                    continue
+
+                hex_prefixes = (
+                    self.settings.audio_serial_prefix.encode("ascii"),
+                    self.settings.mel_serial_prefix.encode("ascii"),
+                )
+                for line in lines:
+                    # Decode hex payloads here, the GUI only gets the values
+                    if line.startswith(hex_prefixes):
+                        self._decode_hex_line(line.strip(), hex_prefixes)
+                        continue
+
+                    decoded = line.decode("ascii", errors="replace").strip()
+                    if "\ufffd" in decoded:
+                        self._count_decode_error()
+                    if decoded:
+                        self._pending.append(decoded)
+
+                if time.monotonic() - self._last_flush >= period:
+                    self._flush_pending()
 
             except Exception as e:
                 self._handle_error(f"Unexpected error in read loop: {e}")
                 break
 
+    def _count_decode_error(self) -> None:
+        """Count lines with non-ASCII bytes, reported at most once per second"""
+        self._decode_errors += 1
+        now = time.monotonic()
+        if now - self._last_decode_report >= 1.0:
+            self.logger.warning(
+                "Decode error: %d line(s) with non-ASCII bytes", self._decode_errors
+            )
+            self._decode_errors = 0
+            self._last_decode_report = now
+
+    def _decode_hex_line(self, line: bytes, hex_prefixes: tuple) -> None:
+        """Decode a hex payload line and queue it with its prefix"""
+        prefix = next(p for p in hex_prefixes if line.startswith(p))
+        payload = np.frombuffer(line, dtype=np.uint8)[len(prefix) :]
+        values = np.empty(payload.size // 4, dtype=np.uint16)
+        if parse_hex_uint16(payload, values) < 0:
+            self.logger.warning("Malformed %s payload", prefix.decode("ascii"))
+            return
+        self._pending.append((prefix.decode("ascii"), values))
+
+    def _flush_pending(self) -> None:
+        """Emit the pending items as a single batch"""
+        if self._pending:
+            self.data_received.emit(self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
     def _process_write_queue(self) -> None:
-        """Process pending write operations"""
+        """Process pending write operations, coalesced into a single write"""
         try:
-            while not self._write_queue.empty():
-                data = self._write_queue.get_nowait()
-                with self._lock:
-                    if self._serial and self._serial.is_open:
-                        self._serial.write(data.encode("ascii"))
-                self._write_queue.task_done()
+            data = b"".join(
+                self._write_queue.popleft() for _ in range(len(self._write_queue))
+            )
+            with self._lock:
+                if self._serial and self._serial.is_open:
+                    self._serial.write(data)
         except Exception as e:
             self.logger.error(f"Write error: {e}")
 
@@ -555,8 +801,27 @@ class SerialReader(QThread):
         """
         if not data:
             return
-        self.logger.debug(f"Queueing data: {data}")
-        self._write_queue.put(data)
+        try:
+            encoded = data.encode("ascii")
+        except UnicodeEncodeError as e:
+            self.logger.error(f"Write error: {e}")
+            return
+        self.logger.debug("Queueing data: %s", data)
+        self._write_queue.append(encoded)
+        # Wake up the reader blocked in read() so the data goes out now
+        serial = self._serial
+        if serial is not None:
+            serial.cancel_read()
+
+    def request_stop(self) -> None:
+        """Ask the thread to stop without waiting for it, see stop()"""
+        self._running = False
+        serial = self._serial
+        if serial is not None:
+            try:
+                serial.cancel_read()
+            except (SerialException, OSError):
+                pass
 
     def stop(self) -> bool:
         """Stop thread safely"""
@@ -571,6 +836,7 @@ class SerialReader(QThread):
             with self._lock:
                 if self._serial:
                     try:
+                        self._serial.cancel_read()
                         self._serial.close()
                     except:
                         pass
@@ -598,26 +864,129 @@ class SerialReader(QThread):
                     pass
                 self._serial = None
 
-            while not self._write_queue.empty():
-                try:
-                    self._write_queue.get_nowait()
-                except:
-                    pass
+            self._write_queue.clear()
 
         self._running = False
         self.connection_state.emit(False)
 
     def _handle_error(self, message: str) -> None:
         """Handle errors uniformly"""
+        self._flush_pending()
         self.logger.error(message)
         self.error_occurred.emit(message)
         self.data_received.emit("CONNECTION_TERMINATED")
         self.stop()
 
 
+###############################################################################
+# Decoding
+
+# Value of each hexadecimal digit, -1 for any other byte
+HEX_LUT = np.full(256, -1, dtype=np.int8)
+HEX_LUT[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+HEX_LUT[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, boundscheck=False)
+    def parse_hex_uint16(payload, out):
+        """
+        Decode the little-endian uint16 words of a hex payload (as uint8 ASCII
+        codes) into out. Words past the end of out are ignored.
+
+        Returns the number of decoded words, or -1 on a non-hex character.
+        """
+        n = min(payload.size // 4, out.size)
+        for i in range(n):
+            j = 4 * i
+            d0 = HEX_LUT[payload[j]]
+            d1 = HEX_LUT[payload[j + 1]]
+            d2 = HEX_LUT[payload[j + 2]]
+            d3 = HEX_LUT[payload[j + 3]]
+            if (d0 | d1 | d2 | d3) < 0:
+                return -1
+            out[i] = (d2 << 12) | (d3 << 8) | (d0 << 4) | d1
+        return n
+
+else:
+
+    def parse_hex_uint16(payload, out):
+        """NumPy version of parse_hex_uint16, when numba is not installed."""
+        n = min(payload.size // 4, out.size)
+        try:
+            words = bytes.fromhex(payload[: 4 * n].tobytes().decode("ascii"))
+        except ValueError:  # Non-hex (or non-ASCII) character
+            return -1
+        if len(words) != 2 * n:  # Whitespace is skipped by bytes.fromhex
+            return -1
+        out[:n] = np.frombuffer(words, dtype="<u2")
+        return n
+
+
 ###############################################################################
 # Plotting
 
+# Formatter of the statistics labels
+format_stat = "{:.2f}".format
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, fastmath=True)
+    def signal_statistics(x):
+        """
+        Max, min, mean and standard deviation of a signal, in a single pass.
+        """
+        if x.size == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        total = 0.0
+        total_sq = 0.0
+        low = x[0]
+        high = x[0]
+        for v in x:
+            total += v
+            total_sq += v * v
+            if v < low:
+                low = v
+            if v > high:
+                high = v
+        mean = total / x.size
+        return (
+            float(high),
+            float(low),
+            mean,
+            np.sqrt(max(total_sq / x.size - mean**2, 0.0)),
+        )
+
+    @numba.njit(cache=True, fastmath=True)
+    def spectrum_db(spectrum, out):
+        """
+        Magnitude in dB of a complex spectrum, written into out.
+
+        Works on the squared magnitude to skip the square root, with a floor of
+        -240 dB to avoid log(0).
+        """
+        for i in range(spectrum.size):
+            z = spectrum[i]
+            power = z.real * z.real + z.imag * z.imag + 1e-24
+            out[i] = 10.0 / np.log(10.0) * np.log(power)
+        return out
+
+else:
+
+    def signal_statistics(x):
+        """NumPy version of signal_statistics, when numba is not installed."""
+        if x.size == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        return float(x.max()), float(x.min()), float(x.mean()), float(x.std())
+
+    def spectrum_db(spectrum, out):
+        """NumPy version of spectrum_db, when numba is not installed."""
+        power = spectrum.real * spectrum.real + spectrum.imag * spectrum.imag
+        out[:] = 10.0 * np.log10(power + 1e-24)
+        return out
+
 
 def save_figure(fig, filename, plot_type, both_types, logger: logging.Logger):
     """
@@ -642,141 +1011,172 @@ class GUI_ParametersWindow(QMainWindow):
         self, type: type, value: any, setting_key: str
     ) -> tuple[any, callable]:
         """Map settings to UI widgets with their update functions"""
-        # Map the type to the correct widget
-        # Bools are mapped to checkboxes
-        if type == bool:
-            widget = QCheckBox()
-            widget.setChecked(value)
-            update_func = lambda state: self.settings.update_values(
-                {setting_key: bool(state)}
-            )
-            callback_func = lambda loc_settings: widget.setChecked(
-                getattr(loc_settings, setting_key)
-            )
-            widget.stateChanged.connect(update_func)
-            return widget, callback_func
-        # Lists are mapped to multiple line edits
-        elif type == list:
-            widgets = []
-            for i, item in enumerate(value):
-                edit = QLineEdit(str(item))
-                update_func = lambda text, idx=i: self.settings.update_values(
-                    {
-                        setting_key: [
-                            x if j != idx else text for j, x in enumerate(value)
-                        ]
-                    }
-                )
-                edit.textChanged.connect(update_func)
-                widgets.append(edit)
+        factory = self._WIDGET_FACTORIES.get(type)
+        if factory is None:
+            # Other types are not supported
+            return QLabel("Unsupported setting type"), None
+        return factory(self, value, setting_key)
+
+    def _make_bool_widget(self, value, setting_key):
+        """Bools are mapped to checkboxes"""
+        widget = QCheckBox()
+        widget.setChecked(value)
+        update_func = partial(self._on_value_changed, setting_key, bool)
+        callback_func = lambda loc_settings: widget.setChecked(
+            getattr(loc_settings, setting_key)
+        )
+        widget.stateChanged.connect(update_func)
+        return widget, callback_func
+
+    def _make_list_widget(self, value, setting_key):
+        """Lists are mapped to multiple line edits"""
+        widgets = []
+        backing = list(value)
+        for i, item in enumerate(value):
+            edit = QLineEdit(str(item))
+            update_func = partial(self._on_list_item_changed, setting_key, backing, i)
+            edit.textChanged.connect(update_func)
+            widgets.append(edit)
+        callback_func = lambda loc_settings: [
+            edit.setText(str(item))
+            for edit, item in zip(widgets, getattr(loc_settings, setting_key))
+        ]
+        return widgets, callback_func
+
+    def _make_tuple_widget(self, value, setting_key):
+        """Tuples are mapped to a single label"""
+        widget = QLabel("(" + " , ".join(map(str, value)) + ")")
+        return widget, None  # Tuples are immutable
+
+    def _make_int_widget(self, value, setting_key):
+        """Ints are mapped to spinboxes"""
+        widget = QSpinBox()
+        widget.setMaximum(2147483647)
+        widget.setMinimum(-2147483647)
+        widget.setValue(value)
+        update_func = partial(self._on_value_changed, setting_key, int)
+        callback_func = lambda loc_settings: widget.setValue(
+            getattr(loc_settings, setting_key)
+        )
+        widget.valueChanged.connect(update_func)
+        return widget, callback_func
+
+    def _make_float_widget(self, value, setting_key):
+        """Floats are mapped to double spinboxes"""
+        widget = QDoubleSpinBox()
+        widget.setMaximum(1e99)
+        widget.setMinimum(-1e99)
+        widget.setDecimals(2)
+        widget.setValue(value)
+        update_func = partial(self._on_value_changed, setting_key, float)
+        callback_func = lambda loc_settings: widget.setValue(
+            getattr(loc_settings, setting_key)
+        )
+        widget.valueChanged.connect(update_func)
+        return widget, callback_func
+
+    def _make_str_widget(self, value, setting_key):
+        """Strings are mapped to line edits"""
+        widget = QLineEdit(value)
+        update_func = partial(self._on_value_changed, setting_key, str)
+        callback_func = lambda loc_settings: widget.setText(
+            getattr(loc_settings, setting_key)
+        )
+        widget.textChanged.connect(update_func)
+        return widget, callback_func
+
+    def _make_path_widget(self, value, setting_key):
+        """PathBox are mapped to line edits with a browse button"""
+        widget = QLineEdit(str(value.path))
+        browse = QPushButton("...")
+        browse.setFixedWidth(30)
+        update_func = partial(self._on_value_changed, setting_key, pathl.Path)
+        callback_func = lambda loc_settings: widget.setText(
+            str(getattr(loc_settings, setting_key).path)
+        )
+        widget.textChanged.connect(update_func)
+        browse.clicked.connect(lambda: self.__open_file_dialog(widget, value.is_folder))
+        return [widget, browse], callback_func
+
+    def _make_choice_widget(self, value, setting_key):
+        """ChoiceBox are mapped to comboboxes"""
+        widget = QComboBox()
+        widget.addItems(value.choices)
+        widget.setCurrentIndex(value.index)
+        update_func = partial(self._on_value_changed, setting_key, int)
+
+        def callback_func(loc_settings):
+            widget.clear()
+            widget.addItems(getattr(loc_settings, setting_key).choices)
+            widget.setCurrentIndex(getattr(loc_settings, setting_key).index)
+
+        widget.currentIndexChanged.connect(update_func)
+        return widget, callback_func
+
+    def _make_dimension_widget(self, value, setting_key):
+        """DimensionElement are mapped to two line edits"""
+        if value.editable:
+            w1 = QLineEdit(str(value.list[0]))
+            label = QLabel("x")
+            w2 = QLineEdit(str(value.list[1]))
+            update_func = partial(self._on_dimension_changed, setting_key, w1, w2)
             callback_func = lambda loc_settings: [
-                edit.setText(str(item))
-                for edit, item in zip(widgets, getattr(loc_settings, setting_key))
+                w1.setText(str(value.list[0])),
+                w2.setText(str(value.list[1])),
             ]
-            return widgets, callback_func
-        # Tuples are mapped to a single label
-        elif type == tuple:
-            widget = QLabel("(" + " , ".join(map(str, value)) + ")")
-            return widget, None  # Tuples are immutable
-        # Ints are mapped to spinboxes
-        elif type == int:
-            widget = QSpinBox()
-            widget.setMaximum(2147483647)
-            widget.setMinimum(-2147483647)
-            widget.setValue(value)
-            update_func = lambda val: self.settings.update_values(
-                {setting_key: int(val)}
-            )
-            callback_func = lambda loc_settings: widget.setValue(
-                getattr(loc_settings, setting_key)
-            )
-            widget.valueChanged.connect(update_func)
-            return widget, callback_func
-        # Floats are mapped to spinboxes
-        elif type == float:
-            widget = QSpinBox()
-            widget.setMaximum(1e99)
-            widget.setMinimum(-1e99)
-            widget.setValue(value)
-            widget.setDecimals(2)
-            update_func = lambda val: self.settings.update_values(
-                {setting_key: float(val)}
-            )
-            callback_func = lambda loc_settings: widget.setValue(
-                getattr(loc_settings, setting_key)
-            )
-            widget.valueChanged.connect(update_func)
-            return widget, callback_func
-        # Strings are mapped to line edits
-        elif type == str:
-            widget = QLineEdit(value)
-            update_func = lambda text: self.settings.update_values(
-                {setting_key: str(text)}
-            )
-            callback_func = lambda loc_settings: widget.setText(
-                getattr(loc_settings, setting_key)
-            )
-            widget.textChanged.connect(update_func)
-            return widget, callback_func
-        # PathBox are mapped to line edits with a browse button
-        elif type == APP_Settings.PathBox:
-            widget = QLineEdit(str(value.path))
-            browse = QPushButton("...")
-            browse.setFixedWidth(30)
-            update_func = lambda text: self.settings.update_values(
-                {setting_key: APP_Settings.PathBox(text, value.is_folder)}
-            )
+            w1.textChanged.connect(update_func)
+            w2.textChanged.connect(update_func)
+            return [w1, label, w2], callback_func
+        else:
+            widget = QLabel(f"{value.list[0]} x {value.list[1]}")
             callback_func = lambda loc_settings: widget.setText(
-                str(getattr(loc_settings, setting_key).path)
-            )
-            widget.textChanged.connect(update_func)
-            browse.clicked.connect(
-                lambda: self.__open_file_dialog(widget, value.is_folder)
+                f"{getattr(loc_settings, setting_key).list[0]} x {getattr(loc_settings, setting_key).list[1]}"
             )
-            return [widget, browse], callback_func
-        # ChoiceBox are mapped to comboboxes
-        elif type == APP_Settings.ChoiceBox:
-            widget = QComboBox()
-            widget.addItems(value.choices)
-            widget.setCurrentIndex(value.index)
-            update_func = lambda idx: self.settings.update_values({setting_key: idx})
-
-            def callback_func(loc_settings):
-                widget.clear()
-                widget.addItems(getattr(loc_settings, setting_key).choices)
-                widget.setCurrentIndex(getattr(loc_settings, setting_key).index)
-
-            widget.currentIndexChanged.connect(update_func)
             return widget, callback_func
-        # DimensionElement are mapped to two line edits
-        elif type == APP_Settings.DimensionElement:
-            if value.editable:
-                w1 = QLineEdit(str(value.list[0]))
-                label = QLabel("x")
-                w2 = QLineEdit(str(value.list[1]))
-                update_func = lambda: self.settings.update_values(
-                    {
-                        setting_key: APP_Settings.DimensionElement(
-                            [int(w1.text()), int(w2.text())]
-                        )
-                    }
-                )
-                callback_func = lambda loc_settings: [
-                    w1.setText(str(value.list[0])),
-                    w2.setText(str(value.list[1])),
-                ]
-                w1.textChanged.connect(update_func)
-                w2.textChanged.connect(update_func)
-                return [w1, label, w2], callback_func
-            else:
-                widget = QLabel(f"{value.list[0]} x {value.list[1]}")
-                callback_func = lambda loc_settings: widget.setText(
-                    f"{getattr(loc_settings, setting_key).list[0]} x {getattr(loc_settings, setting_key).list[1]}"
-                )
-                return widget, callback_func
-        # Other types are not supported
-        else:
-            return QLabel("Unsupported setting type"), None
+
+    # Widget factory of each setting type
+    _WIDGET_FACTORIES = {
+        bool: _make_bool_widget,
+        list: _make_list_widget,
+        tuple: _make_tuple_widget,
+        int: _make_int_widget,
+        float: _make_float_widget,
+        str: _make_str_widget,
+        APP_Settings.PathBox: _make_path_widget,
+        APP_Settings.ChoiceBox: _make_choice_widget,
+        APP_Settings.DimensionElement: _make_dimension_widget,
+    }
+
+    def _queue_update(self, setting_key: str, value) -> None:
+        """Queue a setting update, applied once the edits settle down"""
+        self._pending_updates[setting_key] = value
+        self._debounce_timer.start()
+
+    def _apply_pending_updates(self) -> None:
+        """Apply the queued setting updates at once"""
+        updates, self._pending_updates = self._pending_updates, {}
+        self.settings.update_values(updates)
+
+    def _on_value_changed(self, setting_key: str, cast: type, value) -> None:
+        """Store the new value of a setting widget"""
+        self._queue_update(setting_key, cast(value))
+
+    def _on_list_item_changed(
+        self, setting_key: str, backing: list, index: int, text: str
+    ) -> None:
+        """Store the new value of a list setting item"""
+        backing[index] = text
+        self._queue_update(setting_key, list(backing))
+
+    def _on_dimension_changed(
+        self, setting_key: str, w1: QLineEdit, w2: QLineEdit, _text: str
+    ) -> None:
+        """Store the new value of a dimension setting, once both are numbers"""
+        try:
+            dimension = [int(w1.text()), int(w2.text())]
+        except ValueError:
+            return
+        self._queue_update(setting_key, dimension)
 
     def __open_file_dialog(self, widget, is_folder: bool = False):
         if is_folder:
@@ -795,6 +1195,13 @@ class GUI_ParametersWindow(QMainWindow):
         self.setWindowTitle("Parameters")
         self.resize(640, 480)
 
+        # Debounce the widget edits into a single settings update
+        self._pending_updates = {}
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(150)
+        self._debounce_timer.timeout.connect(self._apply_pending_updates)
+
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
         self.create_gui()
@@ -882,7 +1289,11 @@ class GUI_AudioWindow(QMainWindow):
         self.central_widget.setLayout(self.base_layout)
 
         # Create dummy audio data
-        self.audio_data = np.zeros(1024, dtype=float)
+        self.audio_data = np.zeros(1024, dtype=np.float32)
+        self._axis_len = None
+        self._pending_audio = None
+        self._redraw_pending = False
+        self._stats_dirty = False
 
         # Create the GUI
         self.create_gui()
@@ -894,13 +1305,13 @@ class GUI_AudioWindow(QMainWindow):
         self.logger.debug("Creating the Audio's GUI")
 
         # Set plotting style to blit with an option, and fast
-        plt.style.use("fast")
-        matplotlib.use("Qt5Agg")
+        matplotlib.style.use("fast")
 
         # Add a FPS counter
         self.fps_counter = QLabel("FPS: 0")
         self.base_layout.addWidget(self.fps_counter)
-        self.current_time = time.time()
+        self.current_time = time.perf_counter()
+        self.fps = 0.0
 
         # Create the 2 figures for the audio signal and FFT
         self.fig_audio = Figure(figsize=(8, 6))
@@ -926,14 +1337,16 @@ class GUI_AudioWindow(QMainWindow):
         self.ax_fft.set_title("FFT")
         self.ax_fft.set_xlabel("Frequency (Hz)")
         self.ax_fft.set_ylabel("Magnitude (dB)")
-        self.ax_fft.set_xlim(-10500, 10500)
+        self.ax_fft.set_xlim(0, 10500)
         self.ax_fft.set_ylim(-1, 100)
         self.ax_fft.grid(True)
         self.ax_fft.autoscale(enable=False, axis="both")
 
-        # Add the signal to the plots
-        (self.line_audio,) = self.ax_audio.plot([], [], animated=True)
-        (self.line_fft,) = self.ax_fft.plot([], [], animated=True)
+        # Add the signal to the plots, animated artists are only drawn by the
+        # blitting, so they must be left to the full redraw otherwise
+        blit = self.settings.gui_use_matplotlib_blit
+        (self.line_audio,) = self.ax_audio.plot([], [], animated=blit)
+        (self.line_fft,) = self.ax_fft.plot([], [], animated=blit)
 
         # Make the plots slightly smaller
         self.fig_audio.tight_layout()
@@ -942,24 +1355,14 @@ class GUI_AudioWindow(QMainWindow):
         self.fig_fft.tight_layout()
         self.fig_fft.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.2)
 
-        # Set up animation using blit
-        TARGET_FPS = int(self.settings.gui_update_rate)
-        self.anim_audio = FuncAnimation(
-            self.fig_audio,
-            self._update_audio_plot,
-            init_func=self._init_audio_plot,
-            interval=1 // TARGET_FPS * 1000,
-            blit=self.settings.gui_use_matplotlib_blit,  # Use blit to speed up
-            save_count=1,
-        )
-        self.anim_fft = FuncAnimation(
-            self.fig_fft,
-            self._update_fft_plot,
-            init_func=self._init_fft_plot,
-            interval=1 // TARGET_FPS * 1000,
-            blit=self.settings.gui_use_matplotlib_blit,
-            save_count=1,
-        )
+        # The plots are only redrawn when new data arrives, the backgrounds
+        # are cached after every full draw (first show, resize...) for blitting
+        self._bg_audio = None
+        self._bg_fft = None
+        self._update_axes()
+        if blit:
+            self.canvas_audio.mpl_connect("draw_event", self._on_draw_audio)
+            self.canvas_fft.mpl_connect("draw_event", self._on_draw_fft)
 
         # Create the plot settings box
         self.box_settings = QHBoxLayout()
@@ -993,12 +1396,7 @@ class GUI_AudioWindow(QMainWindow):
         self.check_plot_freeze.stateChanged.connect(
             lambda state: self.settings.update_values({"audio_freeze": bool(state)})
         )
-        self.settings.register_callback(
-            "audio_freeze",
-            lambda loc_settings: self.check_plot_freeze.setChecked(
-                loc_settings.audio_freeze
-            ),
-        )
+        self.settings.register_callback("audio_freeze", self._cb_audio_freeze)
         self.settings_plot_box.addWidget(self.check_plot_freeze, 0, 1)
 
         # Add the settings for the save
@@ -1012,10 +1410,7 @@ class GUI_AudioWindow(QMainWindow):
             )
         )
         self.settings.register_callback(
-            "audio_file_auto_save",
-            lambda loc_settings: self.check_save_auto.setChecked(
-                loc_settings.audio_file_auto_save
-            ),
+            "audio_file_auto_save", self._cb_audio_file_auto_save
         )
         self.settings_save_box.addWidget(self.check_save_auto, 0, 1)
 
@@ -1038,10 +1433,7 @@ class GUI_AudioWindow(QMainWindow):
         self.edit_save_name = QLineEdit(self.settings.audio_file_name_prefix)
         self.settings_save_box.addWidget(self.edit_save_name, 5, 1)
         self.settings.register_callback(
-            "audio_file_name_prefix",
-            lambda loc_settings: self.edit_save_name.setText(
-                loc_settings.audio_file_name_prefix
-            ),
+            "audio_file_name_prefix", self._cb_audio_file_name_prefix
         )
 
         # Add the settings for the save
@@ -1055,10 +1447,7 @@ class GUI_AudioWindow(QMainWindow):
             )
         )
         self.settings.register_callback(
-            "audio_file_save_numpy",
-            lambda loc_settings: self.check_save_numpy.setChecked(
-                loc_settings.audio_file_save_numpy
-            ),
+            "audio_file_save_numpy", self._cb_audio_file_save_numpy
         )
         self.settings_save_box.addWidget(self.check_save_numpy, 2, 1)
 
@@ -1073,10 +1462,7 @@ class GUI_AudioWindow(QMainWindow):
             )
         )
         self.settings.register_callback(
-            "audio_file_save_plots",
-            lambda loc_settings: self.check_save_plots.setChecked(
-                loc_settings.audio_file_save_plots
-            ),
+            "audio_file_save_plots", self._cb_audio_file_save_plots
         )
         self.settings_save_box.addWidget(self.check_save_plots, 3, 1)
 
@@ -1089,12 +1475,7 @@ class GUI_AudioWindow(QMainWindow):
         self.edit_save_types.currentIndexChanged.connect(
             lambda idx: self.settings.update_values({"audio_file_types": idx})
         )
-        self.settings.register_callback(
-            "audio_file_types",
-            lambda loc_settings: self.edit_save_types.setCurrentIndex(
-                loc_settings.audio_file_types.index
-            ),
-        )
+        self.settings.register_callback("audio_file_types", self._cb_audio_file_types)
         self.settings_save_box.addWidget(self.edit_save_types, 6, 1)
 
         # Add the settings for the statistic
@@ -1129,54 +1510,140 @@ class GUI_AudioWindow(QMainWindow):
         self.button_test.clicked.connect(self.test_audio)
         self.base_layout.addWidget(self.button_test)
 
-    def test_audio(self):
-        self.audio_data = np.random.rand(1024)
+        # Refresh the labels at a few Hz, apart from the plot animation
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(200)
+        self.stats_timer.timeout.connect(self._refresh_stats)
+        self.stats_timer.start()
 
-    def _init_audio_plot(self):
-        """Initialize audio line for blitting."""
-        self.line_audio.set_data([], [])
-        return (self.line_audio,)
+    # Settings callbacks
 
-    def _init_fft_plot(self):
-        """Initialize FFT line for blitting."""
-        self.line_fft.set_data([], [])
-        return (self.line_fft,)
+    def _cb_audio_freeze(self, settings):
+        self.check_plot_freeze.setChecked(settings.audio_freeze)
 
-    def _update_audio_plot(self, frame):
-        """Update audio plot for animation."""
-        # Update audio signal
-        x = np.linspace(0, 1, len(self.audio_data))
-        self.line_audio.set_data(x, self.audio_data)
+    def _cb_audio_file_auto_save(self, settings):
+        self.check_save_auto.setChecked(settings.audio_file_auto_save)
 
-        # Update statistics
-        self.label_statistic_max_value.setText(f"{np.max(self.audio_data):.2f}")
-        self.label_statistic_min_value.setText(f"{np.min(self.audio_data):.2f}")
-        self.label_statistic_avg_value.setText(f"{np.mean(self.audio_data):.2f}")
-        self.label_statistic_std_value.setText(f"{np.std(self.audio_data):.2f}")
-
-        return (self.line_audio,)
-
-    def _update_fft_plot(self, frame):
-        """Update FFT plot for animation."""
-        # Calculate FFT
-        fft_data = np.abs(np.fft.fft(self.audio_data))
-        fft_data = 20 * np.log10(fft_data + 1e-12)  # Avoid log(0)
-        fft_data = np.fft.fftshift(fft_data)
-        freqs = np.linspace(-10200, 10200, len(fft_data))
-        self.line_fft.set_data(freqs, fft_data)
+    def _cb_audio_file_name_prefix(self, settings):
+        self.edit_save_name.setText(settings.audio_file_name_prefix)
+
+    def _cb_audio_file_save_numpy(self, settings):
+        self.check_save_numpy.setChecked(settings.audio_file_save_numpy)
+
+    def _cb_audio_file_save_plots(self, settings):
+        self.check_save_plots.setChecked(settings.audio_file_save_plots)
+
+    def _cb_audio_file_types(self, settings):
+        self.edit_save_types.setCurrentIndex(settings.audio_file_types.index)
+
+    def test_audio(self):
+        self.audio_data = np.random.rand(1024).astype(np.float32)
+        self._pending_audio = None
+        self._schedule_redraw()
+
+    def set_audio_data(self, values: np.ndarray):
+        """
+        Show a decoded audio buffer, the 12 bits ADC samples are mapped to
+        [-1, 1]. Buffers arriving before the next redraw replace each other.
+        """
+        self._pending_audio = values
+        self._schedule_redraw()
+
+    def _schedule_redraw(self):
+        """Redraw once at the next event loop iteration."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            QTimer.singleShot(0, self._redraw)
+
+    def _on_draw_audio(self, event):
+        """Cache the audio background after a full draw and redraw the line."""
+        self._bg_audio = self.canvas_audio.copy_from_bbox(self.ax_audio.bbox)
+        self.ax_audio.draw_artist(self.line_audio)
+
+    def _on_draw_fft(self, event):
+        """Cache the FFT background after a full draw and redraw the line."""
+        self._bg_fft = self.canvas_fft.copy_from_bbox(self.ax_fft.bbox)
+        self.ax_fft.draw_artist(self.line_fft)
+
+    def _blit(self, canvas, ax, line, background):
+        """Redraw only the line over the cached background."""
+        if background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(background)
+        ax.draw_artist(line)
+        canvas.blit(ax.bbox)
+
+    def _redraw(self):
+        """Update both plots with the latest audio data."""
+        self._redraw_pending = False
+        if self._pending_audio is not None:
+            values, self._pending_audio = self._pending_audio, None
+            self.audio_data = values.astype(np.float32) * (2 / 4096) - 1
+        if self.settings.audio_freeze:
+            return
+        self._update_audio_plot()
+        self._update_fft_plot()
+        self._stats_dirty = True
+        if self.settings.gui_use_matplotlib_blit:
+            self._blit(
+                self.canvas_audio, self.ax_audio, self.line_audio, self._bg_audio
+            )
+            self._blit(self.canvas_fft, self.ax_fft, self.line_fft, self._bg_fft)
+        else:
+            self.canvas_audio.draw_idle()
+            self.canvas_fft.draw_idle()
+
+    def _update_axes(self):
+        """
+        Rebuild the time and frequency axes for the audio data length, the
+        updates then only replace the y data of the lines.
+        """
+        n = len(self.audio_data)
+        self._x_time = np.linspace(0, 1, n)
+        self._x_freq = np.linspace(0, 10200, n // 2 + 1)
+        self._fft_db = np.full(n // 2 + 1, np.nan, dtype=np.float32)
+        self.line_audio.set_data(self._x_time, self.audio_data)
+        self.line_fft.set_data(self._x_freq, self._fft_db)
+        self._axis_len = n
+
+    def _update_audio_plot(self):
+        """Update the audio line data."""
+        if len(self.audio_data) != self._axis_len:
+            self._update_axes()
+        self.line_audio.set_ydata(self.audio_data)
+
+    def _update_fft_plot(self):
+        """Update the FFT line data."""
+        if len(self.audio_data) != self._axis_len:
+            self._update_axes()
+
+        # Calculate FFT, the signal is real so only the positive frequencies
+        # are shown
+        self.line_fft.set_ydata(spectrum_db(rfft(self.audio_data), self._fft_db))
 
         # Update FPS
-        current_time = time.time()
-        fps = 1 / (current_time - self.current_time)
+        current_time = time.perf_counter()
+        self.fps = 1 / (current_time - self.current_time)
         self.current_time = current_time
-        self.fps_counter.setText(f"FPS: {fps:.2f}")
 
-        # Update energy
-        fft_data_not_db = np.abs(np.fft.fft(self.audio_data))
-        energy = np.sum(fft_data_not_db**2) / len(fft_data_not_db)
-        self.label_statistic_entropoy_value.setText(f"{energy:.2f} units")
+    def _refresh_stats(self):
+        """Update the FPS counter and the statistics labels of new data."""
+        self.fps_counter.setText(f"FPS: {self.fps:.2f}")
+        if not self._stats_dirty:
+            return
+        self._stats_dirty = False
+
+        # Update statistics
+        high, low, mean, std = signal_statistics(self.audio_data)
+        self.label_statistic_max_value.setText(format_stat(high))
+        self.label_statistic_min_value.setText(format_stat(low))
+        self.label_statistic_avg_value.setText(format_stat(mean))
+        self.label_statistic_std_value.setText(format_stat(std))
 
-        return (self.line_fft,)
+        # Update energy, sum(|X|^2) / N equals sum(x^2) by Parseval
+        energy = float(np.dot(self.audio_data, self.audio_data))
+        self.label_statistic_entropoy_value.setText(format_stat(energy) + " units")
 
     def save_audio(self):
         self.logger.debug("Saving audio signal")
@@ -1264,6 +1731,12 @@ class GUI_MainWindow(QMainWindow):
     Main window of the application.
     """
 
+    # Text and color of the serial status label
+    STATUS_CONNECTING = ("Status: Transitioning...", "orange")
+    STATUS_ERROR = ("Status: Error - Disconnected", "red")
+    STATUS_CONNECTED = ("Status: Connected", "green")
+    STATUS_DISCONNECTED = ("Status: Disconnected", "red")
+
     def __init__(self, settings, logger: logging.Logger):
         super().__init__()
         self.settings = settings
@@ -1278,6 +1751,26 @@ class GUI_MainWindow(QMainWindow):
         self.base_layout = QVBoxLayout()
         self.central_widget.setLayout(self.base_layout)
 
+        # Mel spectrogram history, as a ring of the last mel_history_max_mem
+        # frames, and the last decoded frame
+        self._mel_ring = np.zeros(
+            (
+                self.settings.mel_history_max_mem,
+                self.settings.mel_vector_num,
+                self.settings.mel_vector_size,
+            ),
+            dtype=np.uint16,
+        )
+        self._mel_count = 0
+        self.mel_frame = self._mel_ring[0]
+
+        # Last connection state shown, to skip the redundant UI updates
+        self._last_ui_state = None
+
+        # Last errors, shown in the status bar
+        self.error_history = deque(maxlen=50)
+        self._error_times = {}
+
         # Create the GUI
         self.create_gui()
 
@@ -1285,7 +1778,12 @@ class GUI_MainWindow(QMainWindow):
         self.serial_reader = SerialReader(self.settings, self.logger)
         self.serial_reader.error_occurred.connect(self._handle_connection_error)
         self.serial_reader.connection_state.connect(self._handle_connection_state)
-        self.serial_reader.data_received.connect(self._handle_data_received)
+        # The reader already emits its items in batches, at most once per frame
+        self.serial_reader.data_received.connect(
+            self._handle_data_received, Qt.ConnectionType.QueuedConnection
+        )
+        self._close_finalized = False
+        QApplication.instance().aboutToQuit.connect(self._finalize_close)
 
         # Add the console handler (GUI)
         handler = QTextEditLogger(self.console, self.settings)
@@ -1335,9 +1833,13 @@ class GUI_MainWindow(QMainWindow):
         )
 
         def serial_port_callback(settings):
-            self.serial_port_combo.clear()
-            self.serial_port_combo.addItems(settings.serial_port.choices)
-            self.serial_port_combo.setCurrentIndex(settings.serial_port.index)
+            try:
+                self.serial_port_combo.blockSignals(True)
+                self.serial_port_combo.clear()
+                self.serial_port_combo.addItems(settings.serial_port.choices)
+                self.serial_port_combo.setCurrentIndex(settings.serial_port.index)
+            finally:
+                self.serial_port_combo.blockSignals(False)
 
         self.settings.register_callback("serial_port_main", serial_port_callback)
         control_grid.addWidget(self.serial_port_combo, row, 1)
@@ -1353,6 +1855,7 @@ class GUI_MainWindow(QMainWindow):
 
         # Initialize combo box
         self.update_serial_port()
+        serial_port_callback(self.settings)
 
         # >> Serial connect <<
         # Connect button
@@ -1360,8 +1863,16 @@ class GUI_MainWindow(QMainWindow):
         self.serial_connect.clicked.connect(self.toggle_serial)
         self.base_layout.addWidget(self.serial_connect)
         # Status Text
-        self.serial_status = QLabel("Status: Disconnected")
-        self.serial_status.setStyleSheet("color: red")
+        self.serial_status = QLabel(self.STATUS_DISCONNECTED[0])
+        # Palettes of the status colors, cheaper to switch than style sheets
+        self._status_palettes = {}
+        for color in ("red", "green", "orange"):
+            palette = self.serial_status.palette()
+            palette.setColor(QPalette.ColorRole.WindowText, QColor(color))
+            self._status_palettes[color] = palette
+        self.serial_status.setPalette(
+            self._status_palettes[self.STATUS_DISCONNECTED[1]]
+        )
         self.base_layout.addWidget(self.serial_status)
 
         # Add console at the bottom
@@ -1423,7 +1934,7 @@ class GUI_MainWindow(QMainWindow):
         """
         self.logger.debug("Importing settings")
         filename, _ = QFileDialog.getOpenFileName(
-            self, "Import Settings", "", "Settings Files (*.cfg.npy)"
+            self, "Import Settings", "", "Settings Files (*.cfg.pkl)"
         )
         if filename:
             if self.settings.import_settings(filename):
@@ -1437,7 +1948,7 @@ class GUI_MainWindow(QMainWindow):
         """
         self.logger.debug("Exporting settings")
         filename, _ = QFileDialog.getSaveFileName(
-            self, "Export Settings", "", "Settings Files (*.cfg.npy)"
+            self, "Export Settings", "", "Settings Files (*.cfg.pkl)"
         )
         if filename:
             if self.settings.export_settings(filename):
@@ -1574,7 +2085,7 @@ class GUI_MainWindow(QMainWindow):
         """Handle errors without triggering port refresh"""
         self.logger.error(f"Serial connection error: {error_message}")
         self._update_ui_state(connected=False, error=True)
-        QMessageBox.critical(self, "Connection Error", error_message)
+        self._show_error("Connection Error", error_message)
 
     def _handle_connection_state(self, connected: bool) -> None:
         """Handle connection state changes from serial reader"""
@@ -1582,23 +2093,68 @@ class GUI_MainWindow(QMainWindow):
             # Unexpected disconnect
             self.logger.warning("Unexpected serial port disconnect")
             self._update_ui_state(connected=False, error=True)
-            QMessageBox.warning(
-                self, "Connection Lost", "Serial port disconnected unexpectedly"
-            )
+            self._show_error("Connection Lost", "Serial port disconnected unexpectedly")
 
-    def _handle_data_received(self, data: str) -> None:
-        """Handle data received from serial port"""
-        if data == "CONNECTION_TERMINATED":
+    def _handle_data_received(self, data) -> None:
+        """Handle a batch of items received from serial port"""
+        if isinstance(data, str) and data == "CONNECTION_TERMINATED":
             self.logger.warning("Serial port connection terminated")
             self._update_ui_state(connected=False, error=True)
-            QMessageBox.warning(
-                self, "Connection Lost", "Serial port connection terminated"
-            )
+            self._show_error("Connection Lost", "Serial port connection terminated")
         else:
             # Main processing loop
+            mel_prefix = self.settings.mel_serial_prefix
+            audio_prefix = self.settings.audio_serial_prefix
+            for item in data:
+                if isinstance(item, str):
+                    # TODO: Process the text lines
+                    continue
+                prefix, values = item
+                if prefix == mel_prefix:
+                    self._handle_mel(values)
+                elif prefix == audio_prefix:
+                    if self.audio_window.isVisible():
+                        self.audio_window.set_audio_data(values)
+                # TODO: Process the other data
+
+    def _handle_mel(self, values: np.ndarray) -> None:
+        """Store a decoded mel spectrogram in the history"""
+        shape = (
+            self.settings.mel_history_max_mem,
+            self.settings.mel_vector_num,
+            self.settings.mel_vector_size,
+        )
+        if self._mel_ring.shape != shape:
+            self.clear_mel_history(shape)
+        size = shape[1] * shape[2]
+        if values.size < size:
+            self.logger.warning("Malformed mel spectrogram (%d values)", values.size)
+            return
 
-            # TODO: Process the data
-            pass
+        # Extra words (e.g. the CBC MAC) are dropped
+        self.mel_frame = self._mel_ring[self._mel_count % shape[0]]
+        self.mel_frame.reshape(-1)[:] = values[:size]
+        self._mel_count += 1
+
+    def clear_mel_history(self, shape: Optional[tuple] = None) -> None:
+        """Forget the mel spectrogram history, optionally resizing it"""
+        if shape is not None:
+            self._mel_ring = np.zeros(shape, dtype=np.uint16)
+        self._mel_count = 0
+        self.mel_frame = self._mel_ring[0]
+        self.mel_frame[:] = 0
+
+    def mel_history(self, count: Optional[int] = None) -> np.ndarray:
+        """Last count mel spectrograms (all in memory by default), oldest first"""
+        max_mem = len(self._mel_ring)
+        if count is None:
+            count = max_mem
+        # Only the frames still in the ring, each at most once
+        count = min(self._mel_count, max_mem, count)
+        end = self._mel_count % max_mem
+        if count <= end:
+            return self._mel_ring[end - count : end]
+        return np.concatenate((self._mel_ring[end - count :], self._mel_ring[:end]))
 
     def toggle_serial(self) -> None:
         """Toggle the serial connection state between connected and disconnected."""
@@ -1628,48 +2184,70 @@ class GUI_MainWindow(QMainWindow):
         except Exception as e:
             self.logger.error(f"Serial toggle failed: {e}")
             self._update_ui_state(connected=False, error=True)
-            QMessageBox.critical(self, "Error", f"Serial connection error: {e}")
+            self._show_error("Error", f"Serial connection error: {e}")
+
+    def _show_error(self, title: str, message: str) -> None:
+        """
+        Show an error in the status bar, without blocking the event loop. The
+        same error is shown at most once per second, the last ones are kept in
+        the status bar tooltip.
+        """
+        text = f"{title}: {message}"
+        now = time.monotonic()
+        if now - self._error_times.get(text, float("-inf")) < 1.0:
+            return
+        self._error_times[text] = now
+
+        self.error_history.append(f"[{time.strftime('%H:%M:%S')}] {text}")
+        status_bar = self.statusBar()
+        status_bar.showMessage(text, 5000)
+        status_bar.setToolTip("\n".join(self.error_history))
 
     def _update_ui_state(
         self, connected: bool = False, connecting: bool = False, error: bool = False
     ) -> None:
         """Update UI elements based on connection state."""
-        try:
-            # Update button state
-            self.serial_connect.setEnabled(not connecting)
-            self.serial_connect.setText("Disconnect" if connected else "Connect")
-
-            # Update status indicator
-            if connecting:
-                status = "Status: Transitioning..."
-                color = "color: orange"
-            elif error:
-                status = "Status: Error - Disconnected"
-                color = "color: red; font-weight: bold"
-            else:
-                status = f"Status: {'Connected' if connected else 'Disconnected'}"
-                color = f"color: {'green' if connected else 'red'}"
+        state = (connected, connecting, error)
+        if state == self._last_ui_state:
+            return
 
-            self.serial_status.setText(status)
-            self.serial_status.setStyleSheet(color)
+        # Update button state
+        self.serial_connect.setEnabled(not connecting)
+        self.serial_connect.setText("Disconnect" if connected else "Connect")
+
+        # Update status indicator
+        if connecting:
+            status, color = self.STATUS_CONNECTING
+        elif error:
+            status, color = self.STATUS_ERROR
+        elif connected:
+            status, color = self.STATUS_CONNECTED
+        else:
+            status, color = self.STATUS_DISCONNECTED
 
-            # Update other UI elements
-            self.serial_port_combo.setEnabled(not connected)
-            self.serial_port_refresh.setEnabled(not connected)
+        self.serial_status.setText(status)
+        self.serial_status.setPalette(self._status_palettes[color])
+        font = self.serial_status.font()
+        font.setBold(error and not connecting)
+        self.serial_status.setFont(font)
 
-            # Update write UI elements
-            self.text_uart_write.setEnabled(connected)
-            self.button_uart_write.setEnabled(connected)
+        # Update other UI elements
+        self.serial_port_combo.setEnabled(not connected)
+        self.serial_port_refresh.setEnabled(not connected)
 
-        except Exception as e:
-            self.logger.error(f"Failed to update UI state: {e}")
+        # Update write UI elements
+        self.text_uart_write.setEnabled(connected)
+        self.button_uart_write.setEnabled(connected)
+
+        self._last_ui_state = state
 
     def send_uart(self):
         """
         Send UART data.
         """
         data = self.text_uart_write.text()
-        self.logger.info(f"Sending UART data: {data}")
+        self.logger.info("Sending UART data: %s", data)
+        self.serial_reader.send_data(data)
         self.text_uart_write.clear()
 
     def closeEvent(self, event):
@@ -1677,15 +2255,25 @@ class GUI_MainWindow(QMainWindow):
         Close the application.
         """
         self.logger.debug("Closing the application")
-        # Stop the serial reader
+        # Ask the serial reader to stop, it is joined when the application quits
+        self.serial_reader.request_stop()
+        event.accept()
+        # Quit with all the other windows
+        QApplication.instance().quit()
+
+    def _finalize_close(self):
+        """
+        Join the serial reader and close the logger, once the application quits.
+        """
+        if self._close_finalized:
+            return
+        self._close_finalized = True
         self.serial_reader.stop()
-        # Close the logger
         for handler in self.logger.handlers:
+            listener = getattr(handler, "listener", None)
+            if listener is not None:
+                listener.stop()  # Write the queued records
             handler.close()
-        # Close all windows
-        for window in QApplication.topLevelWidgets():
-            window.close()
-        event.accept()
 
 
 ###############################################################################
@@ -1702,6 +2290,7 @@ if __name__ == "__main__":
     logger = setup_logging(settings)
 
     # GUI
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_CompressHighFrequencyEvents)
     app = QApplication(sys.argv)
     main_window = GUI_MainWindow(settings, logger)
     main_window.show()